@@ -1,19 +1,28 @@
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_cors import CORS
+from flask_caching import Cache
+from flask_compress import Compress
 from config import Config
+from utils.responses import OrjsonProvider
 
 db = SQLAlchemy()
 login_manager = LoginManager()
+cache = Cache()
+compress = Compress()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
 
     CORS(app)
     db.init_app(app)
     login_manager.init_app(app)
+    cache.init_app(app)
+    compress.init_app(app)
 
     login_manager.login_view = "auth.login"
 
@@ -35,6 +44,12 @@ def create_app():
     app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
     app.register_blueprint(settings_bp, url_prefix="/api/settings")
 
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """Bring an existing database up to the current schema"""
+        from utils.upgrade import upgrade_database
+        upgrade_database(echo=click.echo)
+
     return app
 
 if __name__ == "__main__":
@@ -14,9 +14,43 @@ class Config:
     DB_PASSWORD = os.getenv("DB_PASSWORD", "")
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_NAME = os.getenv("DB_NAME", "finance_committee")
+    # mysqlclient (C protocol decoding); set DB_DRIVER=pymysql for pure Python
+    DB_DRIVER = os.getenv("DB_DRIVER", "mysqldb")
 
     SQLALCHEMY_DATABASE_URI = (
-        f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+        f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
     )
 
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Optional read replica; analytics queries use it when REPLICA_URI is set
+    REPLICA_URI = os.getenv("REPLICA_URI")
+    SQLALCHEMY_BINDS = {"replica": REPLICA_URI} if REPLICA_URI else {}
+
+    # Batch bulk INSERTs into large multi-row statements (SQLAlchemy 2.0),
+    # keep warm pooled connections and a larger compiled-statement cache
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "insertmanyvalues_page_size": 10000,
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "query_cache_size": 1200
+    }
+
+    # Response cache for analytics endpoints (use RedisCache etc. in production)
+    CACHE_TYPE = os.getenv("CACHE_TYPE", "SimpleCache")
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "60"))
+
+    # Compress JSON responses, preferring Brotli when the client accepts it
+    COMPRESS_ALGORITHM = ["br", "gzip"]
+    COMPRESS_MIN_SIZE = 512
+
+    # Optional JSON file the admin settings are persisted to across restarts
+    SETTINGS_FILE = os.getenv("SETTINGS_FILE")
+
+    # Optional Redis used to share rate-limit counters across workers
+    REDIS_URL = os.getenv("REDIS_URL")
+
+    # Comma-separated keys accepted by api_key_required
+    API_KEYS = tuple(key for key in os.getenv("API_KEYS", "finance-committee-2024").split(",") if key)
\ No newline at end of file
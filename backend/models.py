@@ -10,11 +10,20 @@ def init_models(database_instance, login_manager_instance):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return FCMember.query.get(int(user_id))
+        return db.session.get(FCMember, int(user_id))
+
+
+# Exact fixed-point storage matching DECIMAL(12,2) in schema.sql; values load
+# as floats so the route arithmetic keeps working on plain numbers
+Money = db.Numeric(12, 2, asdecimal=False)
 
 
 class FCMember(UserMixin, db.Model):
     __tablename__ = "fc_members"
+    __table_args__ = (
+        # Last-admin guards look up active admins by role
+        db.Index("ix_fcm_role_active", "role", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -23,7 +32,7 @@ class FCMember(UserMixin, db.Model):
     role = db.Column(db.String(50), default="finance")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, default=True, index=True)
 
     def get_id(self):
         return str(self.id)
@@ -41,18 +50,25 @@ class FCMember(UserMixin, db.Model):
         }
 
 
+# Case-insensitive email lookups probe this instead of depending on the
+# column collation (functional key parts need MySQL 8.0.13+)
+db.Index("ix_fcm_email_lower", db.func.lower(FCMember.email), unique=True)
+
+
 class Sponsor(db.Model):
     __tablename__ = "sponsors"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
-    industry = db.Column(db.String(100))
+    industry = db.Column(db.String(100), index=True)
     contact_person = db.Column(db.String(120))
     email = db.Column(db.String(120))
     phone = db.Column(db.String(20))
-    total_invested = db.Column(db.Float, default=0)
+    total_invested = db.Column(Money, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed, as on events and sponsorships, so MAX(updated_at) for the
+    # report cache key is a single index read
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def to_dict(self):
         """Convert sponsor to dictionary for JSON responses"""
@@ -71,29 +87,67 @@ class Sponsor(db.Model):
 
 class Event(db.Model):
     __tablename__ = "events"
+    __table_args__ = (
+        # Covers date-range filters that also read or order by revenue
+        db.Index("ix_event_date_revenue", "date", "revenue"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
-    date = db.Column(db.Date)
-    budget = db.Column(db.Float)
+    date = db.Column(db.Date, index=True)
+    budget = db.Column(Money)
     footfall = db.Column(db.Integer)
-    revenue = db.Column(db.Float)
+    revenue = db.Column(Money)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+# Top-K by revenue reads the first entries of this index instead of sorting
+# every event (descending indexes need MySQL 8)
+db.Index("ix_event_revenue_desc", Event.revenue.desc())
 
 
 class Sponsorship(db.Model):
     __tablename__ = "sponsorships"
+    __table_args__ = (
+        # One sponsorship per sponsor/event pair; the index behind it also
+        # serves sponsor/event joins, GROUP BY in the ROI analytics and the
+        # sponsor_id foreign key, so sponsor_id has no index of its own
+        db.UniqueConstraint("sponsor_id", "event_id", name="uq_sponsorship_pair"),
+        # Status-filtered listings in newest-first order, and the per-status
+        # GROUP BY in the sponsorship summary; status needs no index of its own
+        db.Index("ix_sp_status_created", "status", db.text("created_at DESC")),
+        # Per-sponsor listings in created_at order; amount is included so the
+        # per-sponsor count and SUM(amount) summary is read from the index alone
+        db.Index("ix_sp_sponsor_created_amount", "sponsor_id", "created_at", "amount"),
+        # Completed-only per-event and per-sponsor totals in the finance
+        # utilities and the ROI report; the aggregated columns are included
+        # so those queries are index-only
+        db.Index("ix_sp_status_event", "status", "event_id", "amount"),
+        db.Index("ix_sp_status_sponsor", "status", "sponsor_id", "amount", "revenue_generated", "roi"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     sponsor_id = db.Column(db.Integer, db.ForeignKey("sponsors.id"))
-    event_id = db.Column(db.Integer, db.ForeignKey("events.id"))
-    amount = db.Column(db.Float)
+    # Per-event listings, totals and reports filter on event_id alone
+    event_id = db.Column(db.Integer, db.ForeignKey("events.id"), index=True)
+    amount = db.Column(Money)
     status = db.Column(db.String(50), default="negotiating")  # negotiating, confirmed, paid, cancelled
-    roi = db.Column(db.Float, default=0.0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    sponsor = db.relationship("Sponsor", backref="sponsorships")
-    event = db.relationship("Event", backref="sponsorships")
+    roi = db.Column(db.Numeric(5, 2, asdecimal=False), default=0.0)
+    # amount * (1 + roi/100), kept by the database so every write path
+    # (including bulk inserts and UPDATE statements) stays consistent
+    revenue_generated = db.Column(
+        db.Numeric(18, 6, asdecimal=False),
+        db.Computed("amount * (100 + COALESCE(roi, 0)) / 100.0", persisted=True)
+    )
+    # Monthly report: every sponsorship created in the month, any status
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Batch-load the parent rows with one IN (...) query per list instead of
+    # one SELECT per sponsorship when to_dict()/list routes read their names
+    sponsor = db.relationship("Sponsor", backref="sponsorships", lazy="selectin")
+    event = db.relationship("Event", backref="sponsorships", lazy="selectin")
 
     def to_dict(self):
         """Convert sponsorship to dictionary for JSON responses"""
@@ -111,6 +165,33 @@ class Sponsorship(db.Model):
         }
 
 
+class EventMonthlyStats(db.Model):
+    """Per-month event totals maintained on every event write (see utils/rollups.py)"""
+    __tablename__ = "event_monthly_stats"
+
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    budget_sum = db.Column(Money, nullable=False, default=0)
+    revenue_sum = db.Column(Money, nullable=False, default=0)
+    footfall_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SponsorRollup(db.Model):
+    """Per-sponsor completed sponsorship totals maintained on every sponsorship write (see utils/rollups.py)"""
+    __tablename__ = "sponsor_rollups"
+    __table_args__ = (
+        # Top-sponsor ranking reads this index in order
+        db.Index("ix_sponsor_rollups_total", "total_investment"),
+    )
+
+    sponsor_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    total_investment = db.Column(Money, nullable=False, default=0)
+    sponsorship_count = db.Column(db.Integer, nullable=False, default=0)
+    # AVG(roi) is recomputed as roi_sum / roi_count, skipping NULL ROIs
+    roi_sum = db.Column(Money, nullable=False, default=0)
+    roi_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 # This function will be defined in app.py to avoid circular imports
 # @login_manager.user_loader
 # def load_user(user_id):
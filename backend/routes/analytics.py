@@ -1,41 +1,139 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app, g
 from flask_login import login_required, current_user
-from sqlalchemy import func, extract
-from app import db
-from models import Event, Sponsorship, Sponsor, FCMember
+from sqlalchemy import case, func, true
+from sqlalchemy.orm import Session
+from app import db, cache
+from models import Event, EventMonthlyStats, Sponsorship, Sponsor, FCMember
 from utils.auth_middleware import require_role, log_api_access
+from utils.cache import is_cacheable_response, get_generation, has_recent_write
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
 
 analytics_bp = Blueprint("analytics", __name__)
 
+# Seconds an analytics response is served from cache; writes invalidate early
+ANALYTICS_CACHE_TIMEOUT = 60
+
+
+def _read_session():
+    """
+    Session for analytics reads: the read replica when one is configured,
+    except shortly after a write, when the replica may not have caught up
+    and its totals would be cached under the new generation
+    """
+    if "replica" not in current_app.config.get("SQLALCHEMY_BINDS", {}) or has_recent_write():
+        return db.session
+    if "read_session" not in g:
+        g.read_session = Session(db.engines["replica"])
+    return g.read_session
+
+
+@analytics_bp.teardown_request
+def close_read_session(exc):
+    """Release the replica connection at the end of the request"""
+    read_session = g.pop("read_session", None)
+    if read_session is not None:
+        read_session.close()
+
+
+class Financials(NamedTuple):
+    """Platform-wide totals shared by the overview and dashboard views"""
+    total_events: int
+    total_budget: float
+    total_revenue: float
+    total_footfall: int
+    total_sponsorships: int
+    total_investment: float
+    total_sponsors: int
+    total_users: int
+    recent_events: int
+    recent_sponsorships: int
+
+
+@lru_cache(maxsize=1)
+def _financials_for(generation):
+    """Run the combined aggregate query; memoized per data generation"""
+    session = _read_session()
+    recent_date = datetime.utcnow() - timedelta(days=30)
+
+    # One aggregate CTE per table, cross-joined into a single result row
+    events = session.query(
+        func.count(Event.id).label('total'),
+        func.coalesce(func.sum(Event.budget), 0).label('budget'),
+        func.coalesce(func.sum(Event.revenue), 0).label('revenue'),
+        func.coalesce(func.sum(Event.footfall), 0).label('footfall'),
+        func.coalesce(func.sum(case((Event.date >= recent_date, 1), else_=0)), 0).label('recent')
+    ).cte('e')
+    sponsorships = session.query(
+        func.count(Sponsorship.id).label('total'),
+        func.coalesce(func.sum(Sponsorship.amount), 0).label('amount'),
+        func.coalesce(func.sum(case((Sponsorship.created_at >= recent_date, 1), else_=0)), 0).label('recent')
+    ).cte('sp')
+    sponsors = session.query(func.count(Sponsor.id).label('total')).cte('s')
+    users = session.query(func.count(FCMember.id).label('total')).filter_by(is_active=True).cte('u')
+
+    row = session.query(
+        events.c.total, events.c.budget, events.c.revenue, events.c.footfall,
+        sponsorships.c.total, sponsorships.c.amount,
+        sponsors.c.total, users.c.total,
+        events.c.recent, sponsorships.c.recent
+    ).select_from(events).join(
+        sponsorships, true()
+    ).join(
+        sponsors, true()
+    ).join(
+        users, true()
+    ).one()
+
+    return Financials(
+        total_events=int(row[0]),
+        total_budget=float(row[1]),
+        total_revenue=float(row[2]),
+        total_footfall=int(row[3]),
+        total_sponsorships=int(row[4]),
+        total_investment=float(row[5]),
+        total_sponsors=int(row[6]),
+        total_users=int(row[7]),
+        recent_events=int(row[8]),
+        recent_sponsorships=int(row[9])
+    )
+
+
+def _compute_financials():
+    """Get platform totals, reusing the result until the next write"""
+    return _financials_for(get_generation())
+
+
+@analytics_bp.after_request
+def add_etag(response):
+    """Tag analytics responses so clients revalidating unchanged data get a 304"""
+    if request.method == "GET" and response.status_code == 200:
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
 
 @analytics_bp.route("/overview")
 @login_required
 @require_role('admin', 'finance')
 @log_api_access
+@cache.cached(timeout=ANALYTICS_CACHE_TIMEOUT, key_prefix='analytics_overview', response_filter=is_cacheable_response)
 def overview():
     """Get overall analytics overview"""
-    events = Event.query.all()
-    sponsorships = Sponsorship.query.all()
-    sponsors = Sponsor.query.all()
-    users = FCMember.query.filter_by(is_active=True).all()
+    totals = _compute_financials()
 
-    total_budget = sum(e.budget or 0 for e in events)
-    total_revenue = sum(e.revenue or 0 for e in events)
-    total_investment = sum(s.amount or 0 for s in sponsorships)
-    total_footfall = sum(e.footfall or 0 for e in events)
-
-    profit = total_revenue - total_budget
-    roi_percentage = ((total_revenue - total_budget) / total_budget * 100) if total_budget > 0 else 0
+    profit = totals.total_revenue - totals.total_budget
+    roi_percentage = (profit / totals.total_budget * 100) if totals.total_budget > 0 else 0
 
     return jsonify({
-        "total_events": len(events),
-        "total_budget": total_budget,
-        "total_revenue": total_revenue,
-        "total_sponsor_investment": total_investment,
-        "total_sponsors": len(sponsors),
-        "total_users": len(users),
-        "total_footfall": total_footfall,
+        "total_events": totals.total_events,
+        "total_budget": totals.total_budget,
+        "total_revenue": totals.total_revenue,
+        "total_sponsor_investment": totals.total_investment,
+        "total_sponsors": totals.total_sponsors,
+        "total_users": totals.total_users,
+        "total_footfall": totals.total_footfall,
         "profit": profit,
         "roi_percentage": round(roi_percentage, 2)
     })
@@ -45,38 +143,36 @@ def overview():
 @login_required
 @require_role('admin', 'finance')
 @log_api_access
+@cache.cached(timeout=ANALYTICS_CACHE_TIMEOUT, key_prefix='analytics_trends', response_filter=is_cacheable_response)
 def trends():
     """Get monthly trends data"""
     try:
+        session = _read_session()
+        
         # Get monthly revenue trends for the last 12 months
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=365)
         
-        # Query events by month
-        monthly_data = db.session.query(
-            extract('year', Event.date).label('year'),
-            extract('month', Event.date).label('month'),
-            func.sum(Event.budget).label('budget'),
-            func.sum(Event.revenue).label('revenue'),
-            func.sum(Event.footfall).label('footfall'),
-            func.count(Event.id).label('event_count')
+        # Read the per-month rollup maintained on event writes
+        monthly_data = session.query(
+            EventMonthlyStats.month,
+            EventMonthlyStats.budget_sum,
+            EventMonthlyStats.revenue_sum,
+            EventMonthlyStats.footfall_sum,
+            EventMonthlyStats.event_count
         ).filter(
-            Event.date >= start_date,
-            Event.date <= end_date
-        ).group_by(
-            extract('year', Event.date),
-            extract('month', Event.date)
+            EventMonthlyStats.month >= f"{start_date.year:04d}-{start_date.month:02d}",
+            EventMonthlyStats.month <= f"{end_date.year:04d}-{end_date.month:02d}",
+            EventMonthlyStats.event_count > 0
         ).order_by(
-            extract('year', Event.date),
-            extract('month', Event.date)
+            EventMonthlyStats.month
         ).all()
         
         # Format response
         trends_data = []
-        for year, month, budget, revenue, footfall, event_count in monthly_data:
-            month_date = datetime(year=int(year), month=int(month), day=1)
+        for month, budget, revenue, footfall, event_count in monthly_data:
             trends_data.append({
-                "month": month_date.strftime('%Y-%m'),
+                "month": month,
                 "budget": float(budget) if budget else 0,
                 "revenue": float(revenue) if revenue else 0,
                 "footfall": int(footfall) if footfall else 0,
@@ -87,8 +183,8 @@ def trends():
         return jsonify({
             "trends": trends_data,
             "period": {
-                "start": start_date.strftime('%Y-%m-%d'),
-                "end": end_date.strftime('%Y-%m-%d')
+                "start": start_date.date().isoformat(),
+                "end": end_date.date().isoformat()
             }
         })
         
@@ -100,11 +196,14 @@ def trends():
 @login_required
 @require_role('admin', 'finance')
 @log_api_access
+@cache.cached(timeout=ANALYTICS_CACHE_TIMEOUT, key_prefix='analytics_roi', response_filter=is_cacheable_response)
 def roi():
     """Get ROI analytics data"""
     try:
+        session = _read_session()
+        
         # Get sponsor ROI data
-        sponsor_roi_data = db.session.query(
+        sponsor_roi_data = session.query(
             Sponsor.id.label('sponsor_id'),
             Sponsor.name.label('sponsor_name'),
             Sponsor.industry.label('industry'),
@@ -120,7 +219,7 @@ def roi():
         ).limit(20).all()
         
         # Get event ROI data
-        event_roi_data = db.session.query(
+        event_roi_data = session.query(
             Event.id.label('event_id'),
             Event.name.label('event_name'),
             Event.date.label('event_date'),
@@ -154,7 +253,7 @@ def roi():
             events_roi.append({
                 "event_id": event_id,
                 "event_name": event_name,
-                "event_date": event_date.strftime('%Y-%m-%d') if event_date else None,
+                "event_date": event_date.isoformat() if event_date else None,
                 "budget": float(budget) if budget else 0,
                 "revenue": float(revenue) if revenue else 0,
                 "sponsorship_amount": float(sponsorship_amount) if sponsorship_amount else 0,
@@ -178,9 +277,12 @@ def roi():
 @login_required
 @require_role('admin', 'finance')
 @log_api_access
+@cache.cached(timeout=ANALYTICS_CACHE_TIMEOUT, key_prefix='analytics_reports', response_filter=is_cacheable_response)
 def reports():
     """Get various analytical reports"""
     try:
+        session = _read_session()
+        
         # Get current date ranges
         today = datetime.utcnow()
         last_month = today - timedelta(days=30)
@@ -190,30 +292,47 @@ def reports():
         # Performance metrics
         performance = {}
         
+        # Event counts per window and last-month financials in one scan
+        recent = Event.date >= last_month
+        (total_events, last_month_events, last_quarter_events, last_year_events,
+         last_month_revenue, last_month_budget) = session.query(
+            func.count(Event.id),
+            func.coalesce(func.sum(case((recent, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Event.date >= last_quarter, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Event.date >= last_year, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((recent, Event.revenue), else_=0)), 0),
+            func.coalesce(func.sum(case((recent, Event.budget), else_=0)), 0)
+        ).one()
+        
         # Event performance
         performance['events'] = {
-            "total": Event.query.count(),
-            "last_month": Event.query.filter(Event.date >= last_month).count(),
-            "last_quarter": Event.query.filter(Event.date >= last_quarter).count(),
-            "last_year": Event.query.filter(Event.date >= last_year).count()
+            "total": total_events,
+            "last_month": int(last_month_events),
+            "last_quarter": int(last_quarter_events),
+            "last_year": int(last_year_events)
         }
         
         # Sponsor performance
+        total_sponsors, active_sponsors = session.query(
+            session.query(func.count(Sponsor.id)).scalar_subquery(),
+            session.query(func.count(func.distinct(Sponsorship.sponsor_id))).scalar_subquery()
+        ).one()
         performance['sponsors'] = {
-            "total": Sponsor.query.count(),
-            "active": Sponsor.query.join(Sponsorship).distinct().count()
+            "total": total_sponsors,
+            "active": active_sponsors
         }
         
         # Financial performance
-        events_last_month = Event.query.filter(Event.date >= last_month).all()
+        last_month_revenue = float(last_month_revenue)
+        last_month_budget = float(last_month_budget)
         performance['financial'] = {
-            "last_month_revenue": sum(e.revenue or 0 for e in events_last_month),
-            "last_month_budget": sum(e.budget or 0 for e in events_last_month),
-            "last_month_profit": sum((e.revenue or 0) - (e.budget or 0) for e in events_last_month)
+            "last_month_revenue": last_month_revenue,
+            "last_month_budget": last_month_budget,
+            "last_month_profit": last_month_revenue - last_month_budget
         }
         
         # Top performing sponsors
-        top_sponsors = db.session.query(
+        top_sponsors = session.query(
             Sponsor.name,
             func.sum(Sponsorship.amount).label('total_amount')
         ).join(
@@ -225,7 +344,7 @@ def reports():
         ).limit(10).all()
         
         # Top performing events
-        top_events = db.session.query(
+        top_events = session.query(
             Event.name,
             Event.date,
             Event.revenue,
@@ -237,7 +356,7 @@ def reports():
         ).limit(10).all()
         
         # Industry breakdown
-        industry_breakdown = db.session.query(
+        industry_breakdown = session.query(
             Sponsor.industry,
             func.count(Sponsor.id).label('count'),
             func.sum(Sponsorship.amount).label('total_investment')
@@ -260,7 +379,7 @@ def reports():
             "top_events": [
                 {
                     "name": name,
-                    "date": date.strftime('%Y-%m-%d') if date else None,
+                    "date": date.isoformat() if date else None,
                     "revenue": float(revenue) if revenue else 0,
                     "budget": float(budget) if budget else 0,
                     "profit": float((revenue or 0) - (budget or 0))
@@ -284,23 +403,14 @@ def reports():
 @login_required
 @require_role('admin', 'finance')
 @log_api_access
+@cache.cached(timeout=ANALYTICS_CACHE_TIMEOUT, key_prefix='analytics_dashboard', response_filter=is_cacheable_response)
 def dashboard():
     """Get comprehensive dashboard analytics"""
     try:
-        # Get basic counts
-        total_events = Event.query.count()
-        total_sponsors = Sponsor.query.count()
-        total_sponsorships = Sponsorship.query.count()
-        total_users = FCMember.query.filter_by(is_active=True).count()
-        
-        # Get financial totals
-        events = Event.query.all()
-        sponsorships = Sponsorship.query.all()
-        
-        total_budget = sum(e.budget or 0 for e in events)
-        total_revenue = sum(e.revenue or 0 for e in events)
-        total_investment = sum(s.amount or 0 for s in sponsorships)
-        total_footfall = sum(e.footfall or 0 for e in events)
+        # Get counts, financial totals and recent activity in one statement
+        (total_events, total_budget, total_revenue, total_footfall, total_sponsorships,
+         total_investment, total_sponsors, total_users,
+         recent_events, recent_sponsorships) = _compute_financials()
         
         # Calculate metrics
         total_profit = total_revenue - total_budget
@@ -308,11 +418,6 @@ def dashboard():
         avg_event_size = total_footfall / total_events if total_events > 0 else 0
         sponsorship_per_event = total_sponsorships / total_events if total_events > 0 else 0
         
-        # Recent activity (last 30 days)
-        recent_date = datetime.utcnow() - timedelta(days=30)
-        recent_events = Event.query.filter(Event.date >= recent_date).count()
-        recent_sponsorships = Sponsorship.query.filter(Sponsorship.created_at >= recent_date).count()
-        
         return jsonify({
             "overview": {
                 "total_events": total_events,
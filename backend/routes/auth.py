@@ -2,33 +2,61 @@
 Enhanced Authentication Routes with Input Validation and Error Handling
 """
 
-from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
+from sqlalchemy import exists, select, update
 from app import db
 from models import FCMember
+from utils.auth_middleware import get_json_body, get_user_by_id
+from utils.cache import invalidate_analytics_cache
+from utils.passwords import constant_time_equals, hash_password, needs_rehash, verify_password
+from functools import lru_cache
 import re
+import string
 from datetime import datetime
 
 auth_bp = Blueprint("auth", __name__)
 
+# Compiled once at import instead of going through re's pattern cache per call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Character classes for the password policy, checked against the set of
+# characters in the password in C rather than with one regex scan per rule
+_UPPERCASE = frozenset(string.ascii_uppercase)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+
+# Upper bound on password length so a huge input cannot make the KDF burn CPU
+MAX_PASSWORD_LENGTH = 128
+
+def _has_other_active_admin(user):
+    """True if an active admin other than user exists; stops at the first match"""
+    return db.session.query(FCMember.id).filter_by(
+        role='admin', is_active=True
+    ).filter(FCMember.id != user.id).limit(1).first() is not None
+
+@lru_cache(maxsize=2048)
 def validate_email(email):
-    """Simple email validation"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    """Simple email validation; cached since the same addresses recur on login"""
+    return _EMAIL_RE.match(email) is not None
 
 def validate_password(password):
     """Password validation - at least 8 chars, one uppercase, one lowercase, one number"""
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
     
-    if not re.search(r'[A-Z]', password):
+    if len(password) > MAX_PASSWORD_LENGTH:
+        return False, f"Password must be at most {MAX_PASSWORD_LENGTH} characters long"
+    
+    chars = set(password)
+    
+    if _UPPERCASE.isdisjoint(chars):
         return False, "Password must contain at least one uppercase letter"
     
-    if not re.search(r'[a-z]', password):
+    if _LOWERCASE.isdisjoint(chars):
         return False, "Password must contain at least one lowercase letter"
     
-    if not re.search(r'\d', password):
+    if _DIGITS.isdisjoint(chars):
         return False, "Password must contain at least one number"
     
     return True, "Password is valid"
@@ -37,20 +65,21 @@ def validate_password(password):
 def register():
     """User registration with validation"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
         
-        # Validate required fields
+        # Validate required fields; JSON strings already arrive as str
         required_fields = ["name", "email", "password"]
         for field in required_fields:
-            if not data.get(field) or not str(data[field]).strip():
+            value = data.get(field)
+            if not isinstance(value, str) or not value.strip():
                 return jsonify({"error": f"{field.capitalize()} is required"}), 400
         
-        name = str(data["name"]).strip()
-        email = str(data["email"]).strip().lower()
-        password = str(data["password"])
+        name = data["name"].strip()
+        email = data["email"].strip().lower()
+        password = data["password"]
         
         # Validate email format
         if not validate_email(email):
@@ -65,20 +94,21 @@ def register():
         if len(name) < 2 or len(name) > 120:
             return jsonify({"error": "Name must be between 2 and 120 characters"}), 400
         
-        # Check if user already exists
-        if FCMember.query.filter_by(email=email).first():
+        # Check if user already exists without loading the row
+        if db.session.execute(select(exists().where(db.func.lower(FCMember.email) == email))).scalar():
             return jsonify({"error": "Email already registered"}), 400
         
         # Create new user
         user = FCMember(
             name=name,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=hash_password(password),
             role=data.get("role", "finance")  # Default to finance role
         )
         
         db.session.add(user)
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Registration successful",
@@ -98,14 +128,18 @@ def register():
 def login():
     """User login with validation"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
         
-        email = data.get("email", "").strip().lower()
+        email = data.get("email", "")
         password = data.get("password", "")
         
+        if not isinstance(email, str) or not isinstance(password, str):
+            return jsonify({"error": "Email and password are required"}), 400
+        
+        email = email.strip().lower()
         if not email or not password:
             return jsonify({"error": "Email and password are required"}), 400
         
@@ -114,15 +148,20 @@ def login():
             return jsonify({"error": "Invalid email format"}), 400
         
         # Find user
-        user = FCMember.query.filter_by(email=email).first()
+        user = FCMember.query.filter(db.func.lower(FCMember.email) == email).first()
         
         if not user:
             return jsonify({"error": "Invalid credentials"}), 401
         
-        # Check password
-        if not check_password_hash(user.password_hash, password):
+        # Check password; over-long input cannot match a valid password
+        if len(password) > MAX_PASSWORD_LENGTH or not verify_password(user.password_hash, password):
             return jsonify({"error": "Invalid credentials"}), 401
         
+        # Upgrade legacy werkzeug hashes to Argon2 now that the password is known
+        if needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        
         # Login user
         login_user(user, remember=data.get("remember", False))
         
@@ -175,7 +214,7 @@ def get_profile():
 def update_profile():
     """Update current user profile"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
@@ -184,33 +223,43 @@ def update_profile():
         
         # Update name if provided
         if "name" in data:
-            name = str(data["name"]).strip()
+            if not isinstance(data["name"], str):
+                return jsonify({"error": "Name must be between 2 and 120 characters"}), 400
+            name = data["name"].strip()
             if len(name) < 2 or len(name) > 120:
                 return jsonify({"error": "Name must be between 2 and 120 characters"}), 400
             user.name = name
         
         # Update email if provided and different
-        if "email" in data and data["email"] != user.email:
-            email = str(data["email"]).strip().lower()
+        if "email" in data and not isinstance(data["email"], str):
+            return jsonify({"error": "Invalid email format"}), 400
+        
+        if "email" in data and not constant_time_equals(data["email"], user.email):
+            email = data["email"].strip().lower()
             if not validate_email(email):
                 return jsonify({"error": "Invalid email format"}), 400
             
             # Check if email is already taken
-            if FCMember.query.filter(FCMember.email == email, FCMember.id != user.id).first():
+            if db.session.execute(select(exists().where(
+                db.func.lower(FCMember.email) == email, FCMember.id != user.id
+            ))).scalar():
                 return jsonify({"error": "Email already registered by another user"}), 400
             
             user.email = email
         
         # Update password if provided
         if "current_password" in data and "new_password" in data:
-            if not check_password_hash(user.password_hash, data["current_password"]):
+            current_password = data["current_password"]
+            if not isinstance(current_password, str) or not isinstance(data["new_password"], str):
+                return jsonify({"error": "Passwords must be strings"}), 400
+            if len(current_password) > MAX_PASSWORD_LENGTH or not verify_password(user.password_hash, current_password):
                 return jsonify({"error": "Current password is incorrect"}), 401
             
             is_valid, message = validate_password(data["new_password"])
             if not is_valid:
                 return jsonify({"error": message}), 400
             
-            user.password_hash = generate_password_hash(data["new_password"])
+            user.password_hash = hash_password(data["new_password"])
         
         db.session.commit()
         
@@ -253,17 +302,13 @@ def get_users():
         if current_user.role != 'admin':
             return jsonify({"error": "Admin access required"}), 403
         
-        users = FCMember.query.all()
+        # Plain rows; the JSON provider encodes the datetimes as ISO 8601
+        users = db.session.execute(select(
+            FCMember.id, FCMember.name, FCMember.email, FCMember.role,
+            FCMember.created_at, FCMember.last_login, FCMember.is_active
+        )).mappings()
         return jsonify({
-            "users": [{
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "role": user.role,
-                "created_at": user.created_at.isoformat() if user.created_at else None,
-                "last_login": user.last_login.isoformat() if user.last_login else None,
-                "is_active": user.is_active
-            } for user in users]
+            "users": [dict(user) for user in users]
         })
         
     except Exception as e:
@@ -281,17 +326,19 @@ def delete_user(user_id):
         if user_id == current_user.id:
             return jsonify({"error": "Cannot delete your own account"}), 400
         
-        user = FCMember.query.get_or_404(user_id)
+        user = get_user_by_id(user_id)
+        if not user:
+            return jsonify({"error": "User not found"}), 404
         
         # Prevent deleting the last admin
         if user.role == 'admin':
-            admin_count = FCMember.query.filter_by(role='admin', is_active=True).count()
-            if admin_count <= 1:
+            if not _has_other_active_admin(user):
                 return jsonify({"error": "Cannot delete the last admin account"}), 400
         
         # Soft delete by deactivating
         user.is_active = False
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({"message": "User deactivated successfully"})
         
@@ -307,7 +354,7 @@ def update_user_role(user_id):
         if current_user.role != 'admin':
             return jsonify({"error": "Admin access required"}), 403
         
-        data = request.json
+        data = get_json_body()
         if not data or "role" not in data:
             return jsonify({"error": "Role is required"}), 400
         
@@ -315,16 +362,18 @@ def update_user_role(user_id):
         if new_role not in ['admin', 'finance']:
             return jsonify({"error": "Invalid role. Must be 'admin' or 'finance'"}), 400
         
-        user = FCMember.query.get_or_404(user_id)
+        user = get_user_by_id(user_id)
+        if not user:
+            return jsonify({"error": "User not found"}), 404
         
         # Prevent removing admin role from last admin
         if user.role == 'admin' and new_role != 'admin':
-            admin_count = FCMember.query.filter_by(role='admin', is_active=True).count()
-            if admin_count <= 1:
+            if not _has_other_active_admin(user):
                 return jsonify({"error": "Cannot remove admin role from last admin"}), 400
         
         user.role = new_role
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "User role updated successfully",
@@ -340,6 +389,51 @@ def update_user_role(user_id):
         db.session.rollback()
         return jsonify({"error": f"Failed to update user role: {str(e)}"}), 500
 
+@auth_bp.route("/users/bulk-role", methods=["PUT"])
+@login_required
+def bulk_update_user_role():
+    """Update the role of many users in one statement (admin only)"""
+    try:
+        if current_user.role != 'admin':
+            return jsonify({"error": "Admin access required"}), 403
+        
+        data = get_json_body()
+        if not data or "role" not in data or "user_ids" not in data:
+            return jsonify({"error": "Role and user_ids are required"}), 400
+        
+        new_role = data["role"]
+        if new_role not in ['admin', 'finance']:
+            return jsonify({"error": "Invalid role. Must be 'admin' or 'finance'"}), 400
+        
+        user_ids = data["user_ids"]
+        if not isinstance(user_ids, list) or not user_ids or \
+                not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids):
+            return jsonify({"error": "user_ids must be a non-empty list of integers"}), 400
+        
+        # Prevent removing the admin role from every remaining admin
+        if new_role != 'admin':
+            remaining_admin = db.session.query(FCMember.id).filter_by(
+                role='admin', is_active=True
+            ).filter(FCMember.id.notin_(user_ids)).limit(1).first()
+            if remaining_admin is None:
+                return jsonify({"error": "Cannot remove admin role from last admin"}), 400
+        
+        result = db.session.execute(
+            update(FCMember).where(FCMember.id.in_(user_ids)).values(role=new_role)
+        )
+        db.session.commit()
+        invalidate_analytics_cache()
+        
+        return jsonify({
+            "message": "User roles updated successfully",
+            "role": new_role,
+            "updated": result.rowcount
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to update user roles: {str(e)}"}), 500
+
 @auth_bp.route("/users/<int:user_id>/toggle-status", methods=["PUT"])
 @login_required
 def toggle_user_status(user_id):
@@ -352,18 +446,20 @@ def toggle_user_status(user_id):
         if user_id == current_user.id:
             return jsonify({"error": "Cannot deactivate your own account"}), 400
         
-        user = FCMember.query.get_or_404(user_id)
+        user = get_user_by_id(user_id)
+        if not user:
+            return jsonify({"error": "User not found"}), 404
         
         # Prevent deactivating last admin
         if user.role == 'admin' and user.is_active:
-            admin_count = FCMember.query.filter_by(role='admin', is_active=True).count()
-            if admin_count <= 1:
+            if not _has_other_active_admin(user):
                 return jsonify({"error": "Cannot deactivate the last admin account"}), 400
         
         user.is_active = not user.is_active
         status_text = "activated" if user.is_active else "deactivated"
         
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": f"User {status_text} successfully",
@@ -1,29 +1,79 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import insert, select
+from sqlalchemy.orm import load_only
 from app import db
-from models import Event
+from models import Event, Sponsorship
+from utils.auth_middleware import get_json_body
+from utils.cache import invalidate_analytics_cache
+from utils.rollups import event_stats, refresh_sponsor_rollups, update_event_monthly_stats
+from utils.responses import stream_json_array, STREAM_CHUNK_SIZE
 import re
-from datetime import datetime
+from datetime import date
 
 events_bp = Blueprint("events", __name__)
 
+# Upper bound on rows accepted by a single bulk request
+BULK_INSERT_LIMIT = 10000
+
 def validate_date(date_string):
-    """Validate date format (YYYY-MM-DD)"""
-    if not date_string:
-        return False
+    """Parse a YYYY-MM-DD date, returning the date or None if invalid"""
+    # fromisoformat also accepts forms like 20240315 and 2024-W11-5
+    if not isinstance(date_string, str) or len(date_string) != 10 or date_string[4] != '-' or date_string[7] != '-':
+        return None
     try:
-        datetime.strptime(date_string, '%Y-%m-%d')
-        return True
+        return date.fromisoformat(date_string)
     except ValueError:
-        return False
+        return None
 
 def validate_positive_number(value):
     """Validate positive numeric values"""
-    try:
-        num = float(value)
-        return num >= 0
-    except (ValueError, TypeError):
-        return False
+    # JSON numbers arrive as int/float already; bool is an int subclass
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value >= 0
+    if isinstance(value, str):
+        try:
+            return float(value) >= 0
+        except ValueError:
+            return False
+    return False
+
+def validate_name(value):
+    """Check for a non-blank string name"""
+    return isinstance(value, str) and bool(value.strip())
+
+def validate_footfall(value):
+    """Validate a non-negative integer attendee count"""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def validate_event_data(data):
+    """Validate a new event payload, returning an error message or None"""
+    if not validate_name(data.get("name")):
+        return "Event name is required"
+    
+    if validate_date(data.get("date")) is None:
+        return "Valid date (YYYY-MM-DD) is required"
+    
+    if "budget" not in data or not validate_positive_number(data["budget"]):
+        return "Budget must be a positive number"
+    
+    if "footfall" in data and not validate_footfall(data["footfall"]):
+        return "Footfall must be a non-negative integer"
+    
+    if "revenue" in data and not validate_positive_number(data["revenue"]):
+        return "Revenue must be a positive number"
+    
+    return None
+
+def event_values(data):
+    """Build column values for a new event from a validated payload"""
+    return {
+        "name": data["name"].strip(),
+        "date": date.fromisoformat(data["date"]),
+        "budget": float(data["budget"]),
+        "footfall": int(data.get("footfall", 0)),
+        "revenue": float(data.get("revenue", 0.00))
+    }
 
 @events_bp.route("/", methods=["POST"])
 @login_required
@@ -31,39 +81,31 @@ def add_event():
     if current_user.role not in ['admin', 'finance']:
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
-    data = request.json
+    data = get_json_body()
     
     if not data:
         return jsonify({"error": "Request body is required"}), 400
     
     # Validate required fields
-    if not data.get("name") or not data.get("name").strip():
-        return jsonify({"error": "Event name is required"}), 400
-    
-    if not data.get("date") or not validate_date(data["date"]):
-        return jsonify({"error": "Valid date (YYYY-MM-DD) is required"}), 400
-    
-    if "budget" not in data or not validate_positive_number(data["budget"]):
-        return jsonify({"error": "Budget must be a positive number"}), 400
+    error = validate_event_data(data)
+    if error:
+        return jsonify({"error": error}), 400
     
     try:
-        event = Event(
-            name=data["name"].strip(),
-            date=datetime.strptime(data["date"], '%Y-%m-%d').date(),
-            budget=float(data["budget"]),
-            footfall=int(data.get("footfall", 0)),
-            revenue=float(data.get("revenue", 0.00))
-        )
+        values = event_values(data)
+        event = Event(**values)
         
         db.session.add(event)
+        update_event_monthly_stats(added=[values])
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Event added successfully",
             "event": {
                 "id": event.id,
                 "name": event.name,
-                "date": event.date.isoformat(),
+                "date": event.date,
                 "budget": float(event.budget),
                 "footfall": event.footfall,
                 "revenue": float(event.revenue)
@@ -74,24 +116,57 @@ def add_event():
         db.session.rollback()
         return jsonify({"error": f"Failed to create event: {str(e)}"}), 500
 
+@events_bp.route("/bulk", methods=["POST"])
+@login_required
+def add_events_bulk():
+    """Create many events in one multi-row INSERT and a single commit"""
+    if current_user.role not in ['admin', 'finance']:
+        return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
+    
+    data = get_json_body()
+    
+    if not data or not isinstance(data, list):
+        return jsonify({"error": "Request body must be a non-empty list of events"}), 400
+    
+    if len(data) > BULK_INSERT_LIMIT:
+        return jsonify({"error": f"At most {BULK_INSERT_LIMIT} events can be created per request"}), 400
+    
+    # Validate every item before touching the database
+    rows = []
+    for index, item in enumerate(data):
+        error = validate_event_data(item) if isinstance(item, dict) else "Event must be an object"
+        if error:
+            return jsonify({"error": f"Event {index}: {error}", "index": index}), 400
+        rows.append(event_values(item))
+    
+    try:
+        db.session.execute(insert(Event), rows)
+        update_event_monthly_stats(added=rows)
+        db.session.commit()
+        invalidate_analytics_cache()
+        
+        return jsonify({
+            "message": "Events added successfully",
+            "created": len(rows)
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to create events: {str(e)}"}), 500
+
 @events_bp.route("/", methods=["GET"])
 @login_required
 def get_events():
     try:
-        events = Event.query.order_by(Event.date.desc()).all()
+        # Money columns already load as floats and the JSON provider encodes
+        # dates, so each row mapping is emitted as-is
+        rows = db.session.execute(
+            select(Event.id, Event.name, Event.date, Event.budget, Event.footfall, Event.revenue)
+            .order_by(Event.date.desc())
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        ).mappings()
         
-        result = []
-        for e in events:
-            result.append({
-                "id": e.id,
-                "name": e.name,
-                "date": e.date.isoformat(),
-                "budget": float(e.budget),
-                "footfall": e.footfall,
-                "revenue": float(e.revenue)
-            })
-        
-        return jsonify(result)
+        return stream_json_array(rows, dict)
         
     except Exception as e:
         return jsonify({"error": f"Failed to fetch events: {str(e)}"}), 500
@@ -100,16 +175,21 @@ def get_events():
 @login_required
 def get_event(event_id):
     try:
-        event = Event.query.get_or_404(event_id)
+        # Only the columns this response returns
+        event = db.session.get(Event, event_id, options=[load_only(
+            Event.id, Event.name, Event.date, Event.budget, Event.footfall, Event.revenue, Event.created_at
+        )])
+        if event is None:
+            return jsonify({"error": "Event not found"}), 404
         
         return jsonify({
             "id": event.id,
             "name": event.name,
-            "date": event.date.isoformat(),
+            "date": event.date,
             "budget": float(event.budget),
             "footfall": event.footfall,
             "revenue": float(event.revenue),
-            "created_at": event.created_at.isoformat() if event.created_at else None
+            "created_at": event.created_at
         })
         
     except Exception as e:
@@ -121,19 +201,23 @@ def update_event(event_id):
     if current_user.role not in ['admin', 'finance']:
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
-    data = request.json
+    data = get_json_body()
     
     if not data:
         return jsonify({"error": "Request body is required"}), 400
     
     try:
-        event = Event.query.get_or_404(event_id)
+        event = db.session.get(Event, event_id)
+        if event is None:
+            return jsonify({"error": "Event not found"}), 404
+        previous = event_stats(event)
         
         # Validate date if provided
         if "date" in data:
-            if not validate_date(data["date"]):
+            event_date = validate_date(data["date"])
+            if event_date is None:
                 return jsonify({"error": "Valid date (YYYY-MM-DD) is required"}), 400
-            event.date = datetime.strptime(data["date"], '%Y-%m-%d').date()
+            event.date = event_date
         
         # Validate numeric fields if provided
         if "budget" in data:
@@ -142,7 +226,7 @@ def update_event(event_id):
             event.budget = float(data["budget"])
         
         if "footfall" in data:
-            if not isinstance(data["footfall"], int) or data["footfall"] < 0:
+            if not validate_footfall(data["footfall"]):
                 return jsonify({"error": "Footfall must be a non-negative integer"}), 400
             event.footfall = data["footfall"]
         
@@ -153,18 +237,20 @@ def update_event(event_id):
         
         # Update name if provided
         if "name" in data:
-            if not data["name"] or not data["name"].strip():
+            if not validate_name(data["name"]):
                 return jsonify({"error": "Event name is required"}), 400
             event.name = data["name"].strip()
         
+        update_event_monthly_stats(added=[event_stats(event)], removed=[previous])
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Event updated successfully",
             "event": {
                 "id": event.id,
                 "name": event.name,
-                "date": event.date.isoformat(),
+                "date": event.date,
                 "budget": float(event.budget),
                 "footfall": event.footfall,
                 "revenue": float(event.revenue)
@@ -182,10 +268,20 @@ def delete_event(event_id):
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
     try:
-        event = Event.query.get_or_404(event_id)
+        event = db.session.get(Event, event_id)
+        if event is None:
+            return jsonify({"error": "Event not found"}), 404
+        
+        # Sponsors whose totals included this event's sponsorships
+        sponsor_ids = db.session.scalars(
+            select(Sponsorship.sponsor_id).where(Sponsorship.event_id == event_id)
+        ).all()
         
         db.session.delete(event)
+        update_event_monthly_stats(removed=[event_stats(event)])
+        refresh_sponsor_rollups(sponsor_ids)
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({"message": "Event deleted successfully"})
         
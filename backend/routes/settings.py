@@ -1,13 +1,25 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
-from utils.auth_middleware import admin_required, log_api_access
+from sqlalchemy import case, func
+from app import db
+from models import FCMember, Sponsor, Event, Sponsorship
+from utils.auth_middleware import admin_required, get_json_body, log_api_access
+from config import Config
+import json
 import os
+import tempfile
+import threading
 from datetime import datetime
+from types import MappingProxyType
+try:
+    import fcntl
+except ImportError:  # Windows: saves from separate processes are not serialized
+    fcntl = None
 
 settings_bp = Blueprint("settings", __name__)
 
-# In-memory settings storage (in production, use database or config files)
-app_settings = {
+# Default settings, persisted to Config.SETTINGS_FILE when one is configured
+_DEFAULTS = MappingProxyType({
     "allow_registration": True,
     "default_role": "finance",
     "session_timeout": 60,
@@ -18,7 +30,95 @@ app_settings = {
     "allow_password_reset": True,
     "api_rate_limit": 100,
     "api_rate_window": 3600  # 1 hour
-}
+})
+
+# Seconds to wait for further changes before writing settings to disk, so a
+# burst of updates results in a single write
+SETTINGS_SAVE_DELAY = 1.0
+_save_timer = None
+
+def _file_mtime():
+    """Modification time of the settings file, or None when there is none"""
+    try:
+        return os.stat(Config.SETTINGS_FILE).st_mtime_ns
+    except (TypeError, FileNotFoundError):
+        return None
+
+def _load_settings():
+    """Start from the defaults, overlaid with any persisted values"""
+    settings = dict(_DEFAULTS)
+    if Config.SETTINGS_FILE and os.path.exists(Config.SETTINGS_FILE):
+        with open(Config.SETTINGS_FILE) as f:
+            stored = json.load(f)
+        settings.update({key: value for key, value in stored.items() if key in _DEFAULTS})
+    return settings
+
+# Copy-on-write settings: readers take the current immutable snapshot without
+# locking; writers build a new dict and swap the reference in one store. Other
+# worker processes save to the same file, so a changed mtime triggers a reload,
+# with this process's not yet saved changes applied on top
+_settings_mtime = _file_mtime()
+_SETTINGS_REF = [MappingProxyType(_load_settings())]
+_pending_changes = {}
+_settings_write_lock = threading.RLock()
+
+def current_settings():
+    """Get the current read-only settings snapshot"""
+    if Config.SETTINGS_FILE and _file_mtime() != _settings_mtime:
+        _reload_settings()
+    return _SETTINGS_REF[0]
+
+def _reload_settings():
+    global _settings_mtime
+    with _settings_write_lock:
+        mtime = _file_mtime()
+        if mtime == _settings_mtime:
+            return
+        _SETTINGS_REF[0] = MappingProxyType({**_load_settings(), **_pending_changes})
+        _settings_mtime = mtime
+
+def _write_settings():
+    """
+    Merge this process's pending changes into the settings file atomically:
+    re-read it under an exclusive lock, write a unique temp file, fsync, rename
+    """
+    global _settings_mtime
+    settings_dir = os.path.dirname(os.path.abspath(Config.SETTINGS_FILE))
+    with _settings_write_lock, open(f"{Config.SETTINGS_FILE}.lock", "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        settings = {**_load_settings(), **_pending_changes}
+        fd, temp_path = tempfile.mkstemp(dir=settings_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(settings, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, Config.SETTINGS_FILE)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        _pending_changes.clear()
+        _SETTINGS_REF[0] = MappingProxyType(settings)
+        _settings_mtime = _file_mtime()
+
+def _schedule_save():
+    """Debounce persistence; each change restarts the save timer"""
+    global _save_timer
+    if _save_timer is not None:
+        _save_timer.cancel()
+    _save_timer = threading.Timer(SETTINGS_SAVE_DELAY, _write_settings)
+    _save_timer.start()
+
+def _update_settings(changes):
+    """Publish a snapshot with the given changes and queue them for persistence"""
+    with _settings_write_lock:
+        new_settings = {**current_settings(), **changes}
+        _SETTINGS_REF[0] = MappingProxyType(new_settings)
+        if Config.SETTINGS_FILE:
+            _pending_changes.update(changes)
+            _schedule_save()
+    return new_settings
 
 @settings_bp.route("/", methods=["GET"])
 @login_required
@@ -28,8 +128,8 @@ def get_settings():
     """Get all system settings"""
     try:
         return jsonify({
-            "settings": app_settings,
-            "last_updated": datetime.utcnow().isoformat()
+            "settings": dict(current_settings()),
+            "last_updated": datetime.utcnow()
         })
     except Exception as e:
         return jsonify({"error": f"Failed to get settings: {str(e)}"}), 500
@@ -41,7 +141,7 @@ def get_settings():
 def update_settings():
     """Update system settings"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
@@ -79,14 +179,16 @@ def update_settings():
                     if not isinstance(value, bool):
                         return jsonify({"error": f"{key} must be a boolean"}), 400
                 
-                app_settings[key] = value
                 updated_settings[key] = value
         
+        # Apply all validated changes as one new snapshot
+        new_settings = _update_settings(updated_settings)
+        
         return jsonify({
             "message": "Settings updated successfully",
             "updated_settings": updated_settings,
-            "all_settings": app_settings,
-            "updated_at": datetime.utcnow().isoformat()
+            "all_settings": new_settings,
+            "updated_at": datetime.utcnow()
         })
         
     except Exception as e:
@@ -100,9 +202,9 @@ def backup_settings():
     """Get settings backup as JSON"""
     try:
         backup_data = {
-            "settings": app_settings,
+            "settings": dict(current_settings()),
             "backup_info": {
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.utcnow(),
                 "created_by": current_user.name,
                 "version": "1.0"
             }
@@ -119,7 +221,7 @@ def backup_settings():
 def restore_settings():
     """Restore settings from backup"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data or "settings" not in data:
             return jsonify({"error": "Backup data is required"}), 400
@@ -130,16 +232,14 @@ def restore_settings():
             return jsonify({"error": "Invalid backup format"}), 400
         
         # Restore only valid settings
-        valid_keys = set(app_settings.keys())
-        for key, value in backup_settings.items():
-            if key in valid_keys:
-                app_settings[key] = value
+        restored = {key: value for key, value in backup_settings.items() if key in _DEFAULTS}
+        new_settings = _update_settings(restored)
         
         return jsonify({
             "message": "Settings restored successfully",
-            "restored_settings": len([k for k in backup_settings.keys() if k in valid_keys]),
-            "current_settings": app_settings,
-            "restored_at": datetime.utcnow().isoformat()
+            "restored_settings": len(restored),
+            "current_settings": new_settings,
+            "restored_at": datetime.utcnow()
         })
         
     except Exception as e:
@@ -152,26 +252,12 @@ def restore_settings():
 def reset_settings():
     """Reset settings to default values"""
     try:
-        # Default settings
-        default_settings = {
-            "allow_registration": True,
-            "default_role": "finance",
-            "session_timeout": 60,
-            "maintenance_mode": False,
-            "max_login_attempts": 5,
-            "lockout_duration": 900,
-            "require_email_verification": False,
-            "allow_password_reset": True,
-            "api_rate_limit": 100,
-            "api_rate_window": 3600
-        }
-        
-        app_settings.update(default_settings)
+        _update_settings(dict(_DEFAULTS))
         
         return jsonify({
             "message": "Settings reset to defaults successfully",
-            "default_settings": default_settings,
-            "reset_at": datetime.utcnow().isoformat()
+            "default_settings": dict(_DEFAULTS),
+            "reset_at": datetime.utcnow()
         })
         
     except Exception as e:
@@ -184,23 +270,32 @@ def reset_settings():
 def get_system_info():
     """Get system information and statistics"""
     try:
-        from models import FCMember, Sponsor, Event, Sponsorship
-        
-        # Get database statistics
-        user_count = FCMember.query.count()
-        active_user_count = FCMember.query.filter_by(is_active=True).count()
-        admin_count = FCMember.query.filter_by(role='admin', is_active=True).count()
+        # Get database statistics in one statement: members are counted in a
+        # single pass, the other tables as scalar subqueries
+        active = FCMember.is_active.is_(True)
+        users = db.session.query(
+            func.count(FCMember.id).label('total'),
+            func.coalesce(func.sum(case((active, 1), else_=0)), 0).label('active'),
+            func.coalesce(func.sum(case((active & (FCMember.role == 'admin'), 1), else_=0)), 0).label('admins')
+        ).subquery()
+        (user_count, active_user_count, admin_count,
+         sponsor_count, event_count, sponsorship_count) = db.session.query(
+            users.c.total,
+            users.c.active,
+            users.c.admins,
+            db.session.query(func.count(Sponsor.id)).scalar_subquery(),
+            db.session.query(func.count(Event.id)).scalar_subquery(),
+            db.session.query(func.count(Sponsorship.id)).scalar_subquery()
+        ).one()
         
-        sponsor_count = Sponsor.query.count()
-        event_count = Event.query.count()
-        sponsorship_count = Sponsorship.query.count()
+        settings = current_settings()
         
         # Get system info
         system_info = {
             "database": {
                 "total_users": user_count,
-                "active_users": active_user_count,
-                "admin_users": admin_count,
+                "active_users": int(active_user_count),
+                "admin_users": int(admin_count),
                 "total_sponsors": sponsor_count,
                 "total_events": event_count,
                 "total_sponsorships": sponsorship_count
@@ -212,12 +307,12 @@ def get_system_info():
             },
             "security": {
                 "password_min_length": 8,
-                "session_timeout_minutes": app_settings.get("session_timeout", 60),
-                "max_login_attempts": app_settings.get("max_login_attempts", 5),
-                "lockout_duration_minutes": app_settings.get("lockout_duration", 900) // 60
+                "session_timeout_minutes": settings.get("session_timeout", 60),
+                "max_login_attempts": settings.get("max_login_attempts", 5),
+                "lockout_duration_minutes": settings.get("lockout_duration", 900) // 60
             },
-            "current_settings": app_settings,
-            "timestamp": datetime.utcnow().isoformat()
+            "current_settings": dict(settings),
+            "timestamp": datetime.utcnow()
         }
         
         return jsonify(system_info)
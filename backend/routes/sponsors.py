@@ -1,23 +1,113 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import func, insert, select
 from app import db
 from models import Sponsor
-import re
+from utils.auth_middleware import get_json_body
+from utils.cache import invalidate_analytics_cache
+from utils.responses import stream_json_array, STREAM_CHUNK_SIZE
+from utils.rollups import refresh_sponsor_rollups
+import string
 
 sponsors_bp = Blueprint("sponsors", __name__)
 
+# Upper bound on rows accepted by a single bulk request
+BULK_INSERT_LIMIT = 10000
+
+# Optional free-text sponsor columns, stored as None when blank
+OPTIONAL_FIELDS = ("industry", "contact_person", "email", "phone")
+
+def _invalid_field(data, keys=OPTIONAL_FIELDS):
+    """First optional field that holds neither a string nor null, if any"""
+    return next((key for key in keys if data.get(key) is not None and not isinstance(data[key], str)), None)
+
+def _clean_fields(data, keys=OPTIONAL_FIELDS):
+    """Strip each optional string field in one pass; blanks and missing fields become None"""
+    return {
+        key: (data.get(key) or "").strip() or None
+        for key in keys
+    }
+
+# Phone bytes: digits count 1, separators (whitespace as str.isspace() sees
+# it, dashes, parentheses) count 0, anything else is invalid
+_PHONE_INVALID = 2
+_PHONE_CLASS = bytes(
+    1 if chr(char) in string.digits else 0 if chr(char).isspace() or chr(char) in '-()' else _PHONE_INVALID
+    for char in range(256)
+)
+
+# Character classes for the email scanner, looked up by byte value
+_LOCAL, _DOMAIN, _ALPHA, _DOT, _AT = 1, 2, 4, 8, 16
+
+def _build_email_classes():
+    table = bytearray(256)
+    for char in string.ascii_letters:
+        table[ord(char)] = _LOCAL | _DOMAIN | _ALPHA
+    for char in string.digits + "-":
+        table[ord(char)] = _LOCAL | _DOMAIN
+    for char in "_%+":
+        table[ord(char)] = _LOCAL
+    table[ord(".")] = _LOCAL | _DOMAIN | _DOT
+    table[ord("@")] = _AT
+    return bytes(table)
+
+_EMAIL_CLASS = _build_email_classes()
+
+def validate_name(value):
+    """Check for a non-blank string name"""
+    return isinstance(value, str) and bool(value.strip())
+
 def validate_email(email):
-    """Simple email validation"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    """Simple email validation in one linear pass (local@domain.tld)"""
+    if not isinstance(email, str) or not email.isascii():
+        return False
+    
+    local_length = 0
+    domain_length = 0
+    last_dot = -1  # Offset of the last dot within the domain
+    tail_alpha = False  # Only letters seen since that dot
+    in_domain = False
+    for byte in email.encode():
+        kind = _EMAIL_CLASS[byte]
+        if not in_domain:
+            if kind & _AT:
+                in_domain = True
+            elif kind & _LOCAL:
+                local_length += 1
+            else:
+                return False
+        elif not kind & _DOMAIN:
+            return False
+        else:
+            if kind & _DOT:
+                last_dot, tail_alpha = domain_length, True
+            elif not kind & _ALPHA:
+                tail_alpha = False
+            domain_length += 1
+    
+    # Non-empty local part and domain label, then a TLD of 2+ letters
+    return local_length > 0 and last_dot > 0 and tail_alpha and domain_length - last_dot > 2
 
 def validate_phone(phone):
     """Simple phone validation"""
     if not phone:
         return True  # Phone is optional
-    # Remove spaces, dashes, parentheses
-    clean_phone = re.sub(r'[\s\-\(\)]', '', phone)
-    return clean_phone.isdigit() and len(clean_phone) >= 10
+    if not isinstance(phone, str):
+        return False
+    if not phone.isascii():
+        # Unicode whitespace (e.g. a pasted non-breaking space) separates too
+        phone = ''.join(char for char in phone if not char.isspace())
+        if not phone.isascii():
+            return False
+    
+    # Count digits in one pass, ignoring spaces, dashes and parentheses
+    digits = 0
+    for byte in phone.encode():
+        kind = _PHONE_CLASS[byte]
+        if kind == _PHONE_INVALID:
+            return False
+        digits += kind
+    return digits >= 10
 
 @sponsors_bp.route("/", methods=["POST"])
 @login_required
@@ -25,16 +115,20 @@ def add_sponsor():
     if current_user.role not in ['admin', 'finance']:
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
-    data = request.json
+    data = get_json_body()
     
     if not data:
         return jsonify({"error": "Request body is required"}), 400
     
     # Validate required fields
-    if not data.get("name") or not data.get("name").strip():
+    if not validate_name(data.get("name")):
         return jsonify({"error": "Sponsor name is required"}), 400
     
     # Validate optional fields
+    invalid = _invalid_field(data)
+    if invalid:
+        return jsonify({"error": f"{invalid} must be a string"}), 400
+    
     email = data.get("email")
     if email and not validate_email(email):
         return jsonify({"error": "Invalid email format"}), 400
@@ -46,15 +140,13 @@ def add_sponsor():
     try:
         sponsor = Sponsor(
             name=data["name"].strip(),
-            industry=data.get("industry", "").strip() or None,
-            contact_person=data.get("contact_person", "").strip() or None,
-            email=data.get("email", "").strip() or None,
-            phone=data.get("phone", "").strip() or None,
+            **_clean_fields(data),
             total_invested=0.00
         )
         
         db.session.add(sponsor)
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Sponsor added successfully",
@@ -73,25 +165,74 @@ def add_sponsor():
         db.session.rollback()
         return jsonify({"error": f"Failed to create sponsor: {str(e)}"}), 500
 
+@sponsors_bp.route("/bulk", methods=["POST"])
+@login_required
+def add_sponsors_bulk():
+    """Create many sponsors in one multi-row INSERT and a single commit"""
+    if current_user.role not in ['admin', 'finance']:
+        return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
+    
+    data = get_json_body()
+    
+    if not data or not isinstance(data, list):
+        return jsonify({"error": "Request body must be a non-empty list of sponsors"}), 400
+    
+    if len(data) > BULK_INSERT_LIMIT:
+        return jsonify({"error": f"At most {BULK_INSERT_LIMIT} sponsors can be created per request"}), 400
+    
+    # Validate every item before touching the database
+    rows = []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            error = "Sponsor must be an object"
+        elif not validate_name(item.get("name")):
+            error = "Sponsor name is required"
+        elif invalid := _invalid_field(item):
+            error = f"{invalid} must be a string"
+        elif item.get("email") and not validate_email(item["email"]):
+            error = "Invalid email format"
+        elif item.get("phone") and not validate_phone(item["phone"]):
+            error = "Invalid phone number format"
+        else:
+            error = None
+        
+        if error:
+            return jsonify({"error": f"Sponsor {index}: {error}", "index": index}), 400
+        
+        rows.append({
+            "name": item["name"].strip(),
+            **_clean_fields(item),
+            "total_invested": 0.00
+        })
+    
+    try:
+        db.session.execute(insert(Sponsor), rows)
+        db.session.commit()
+        invalidate_analytics_cache()
+        
+        return jsonify({
+            "message": "Sponsors added successfully",
+            "created": len(rows)
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to create sponsors: {str(e)}"}), 500
+
 @sponsors_bp.route("/", methods=["GET"])
 @login_required
 def get_sponsors():
     try:
-        sponsors = Sponsor.query.all()
-        
-        result = []
-        for s in sponsors:
-            result.append({
-                "id": s.id,
-                "name": s.name,
-                "industry": s.industry,
-                "contact_person": s.contact_person,
-                "email": s.email,
-                "phone": s.phone,
-                "total_invested": float(s.total_invested) if s.total_invested else 0.00
-            })
-        
-        return jsonify(result)
+        # Rows come back shaped like the response, so each mapping is emitted as-is
+        rows = db.session.execute(
+            select(
+                Sponsor.id, Sponsor.name, Sponsor.industry, Sponsor.contact_person,
+                Sponsor.email, Sponsor.phone,
+                func.coalesce(Sponsor.total_invested, 0).label("total_invested")
+            ).execution_options(yield_per=STREAM_CHUNK_SIZE)
+        ).mappings()
+        
+        return stream_json_array(rows, dict)
         
     except Exception as e:
         return jsonify({"error": f"Failed to fetch sponsors: {str(e)}"}), 500
@@ -100,7 +241,9 @@ def get_sponsors():
 @login_required
 def get_sponsor(sponsor_id):
     try:
-        sponsor = Sponsor.query.get_or_404(sponsor_id)
+        sponsor = db.session.get(Sponsor, sponsor_id)
+        if sponsor is None:
+            return jsonify({"error": "Sponsor not found"}), 404
         
         return jsonify({
             "id": sponsor.id,
@@ -110,7 +253,7 @@ def get_sponsor(sponsor_id):
             "email": sponsor.email,
             "phone": sponsor.phone,
             "total_invested": float(sponsor.total_invested) if sponsor.total_invested else 0.00,
-            "created_at": sponsor.created_at.isoformat() if sponsor.created_at else None
+            "created_at": sponsor.created_at
         })
         
     except Exception as e:
@@ -122,13 +265,19 @@ def update_sponsor(sponsor_id):
     if current_user.role not in ['admin', 'finance']:
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
-    data = request.json
+    data = get_json_body()
     
     if not data:
         return jsonify({"error": "Request body is required"}), 400
     
     try:
-        sponsor = Sponsor.query.get_or_404(sponsor_id)
+        sponsor = db.session.get(Sponsor, sponsor_id)
+        if sponsor is None:
+            return jsonify({"error": "Sponsor not found"}), 404
+        
+        invalid = _invalid_field(data)
+        if invalid:
+            return jsonify({"error": f"{invalid} must be a string"}), 400
         
         # Validate email if provided
         email = data.get("email")
@@ -142,16 +291,15 @@ def update_sponsor(sponsor_id):
         
         # Update fields
         if "name" in data:
-            if not data["name"] or not data["name"].strip():
+            if not validate_name(data["name"]):
                 return jsonify({"error": "Sponsor name is required"}), 400
             sponsor.name = data["name"].strip()
         
-        sponsor.industry = data.get("industry", "").strip() or None
-        sponsor.contact_person = data.get("contact_person", "").strip() or None
-        sponsor.email = data.get("email", "").strip() or None
-        sponsor.phone = data.get("phone", "").strip() or None
+        for key, value in _clean_fields(data).items():
+            setattr(sponsor, key, value)
         
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Sponsor updated successfully",
@@ -177,10 +325,14 @@ def delete_sponsor(sponsor_id):
         return jsonify({"error": "Unauthorized. Admin or finance role required."}), 403
     
     try:
-        sponsor = Sponsor.query.get_or_404(sponsor_id)
+        sponsor = db.session.get(Sponsor, sponsor_id)
+        if sponsor is None:
+            return jsonify({"error": "Sponsor not found"}), 404
         
         db.session.delete(sponsor)
+        refresh_sponsor_rollups({sponsor_id})
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({"message": "Sponsor deleted successfully"})
         
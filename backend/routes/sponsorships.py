@@ -1,25 +1,49 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from app import db
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from app import db, cache
 from models import Sponsorship, Sponsor, Event
-from utils.auth_middleware import require_role, log_api_access
+from utils.auth_middleware import require_role, log_api_access, get_json_body
+from utils.cache import invalidate_analytics_cache, is_cacheable_response
+from utils.responses import stream_json_array, STREAM_CHUNK_SIZE
+from utils.rollups import refresh_sponsor_rollups
 import re
 from datetime import datetime
 
 sponsorships_bp = Blueprint("sponsorships", __name__)
 
+_VALID_STATUSES = frozenset({'negotiating', 'confirmed', 'paid', 'cancelled'})
+
+# Seconds the stats response is served from cache; writes invalidate early
+STATS_CACHE_TIMEOUT = 60
+
+# Upper bound on rows accepted by a single bulk request
+BULK_INSERT_LIMIT = 10000
+
 def validate_positive_number(value):
     """Validate positive numeric values"""
-    try:
-        num = float(value)
-        return num >= 0
-    except (ValueError, TypeError):
-        return False
+    # JSON numbers arrive as int/float already; bool is an int subclass
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value >= 0
+    if isinstance(value, str):
+        try:
+            return float(value) >= 0
+        except ValueError:
+            return False
+    return False
+
+def sponsorship_totals(**criteria):
+    """Count and sum sponsorships matching column filters, aggregated in SQL"""
+    count, total = db.session.query(
+        db.func.count(Sponsorship.id),
+        db.func.coalesce(db.func.sum(Sponsorship.amount), 0)
+    ).filter_by(**criteria).one()
+    return count, float(total)
 
 def validate_status(status):
     """Validate sponsorship status"""
-    valid_statuses = ['negotiating', 'confirmed', 'paid', 'cancelled']
-    return status in valid_statuses
+    return isinstance(status, str) and status in _VALID_STATUSES
 
 @sponsorships_bp.route("/", methods=["POST"])
 @login_required
@@ -28,7 +52,7 @@ def validate_status(status):
 def add_sponsorship():
     """Create a new sponsorship"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
@@ -45,24 +69,19 @@ def add_sponsorship():
         if not validate_status(status):
             return jsonify({"error": "Invalid status. Must be: negotiating, confirmed, paid, or cancelled"}), 400
         
-        # Check if sponsor and event exist
-        sponsor = Sponsor.query.get(data["sponsor_id"])
-        if not sponsor:
+        # Check sponsor and event in one round trip; a missing one comes back
+        # as a NULL name. Duplicates are left to the unique constraint below
+        sponsor_name, event_name = db.session.execute(select(
+            select(Sponsor.name).where(Sponsor.id == data["sponsor_id"]).scalar_subquery(),
+            select(Event.name).where(Event.id == data["event_id"]).scalar_subquery()
+        )).one()
+        
+        if sponsor_name is None:
             return jsonify({"error": "Sponsor not found"}), 404
         
-        event = Event.query.get(data["event_id"])
-        if not event:
+        if event_name is None:
             return jsonify({"error": "Event not found"}), 404
         
-        # Check for duplicate sponsorship
-        existing = Sponsorship.query.filter_by(
-            sponsor_id=data["sponsor_id"],
-            event_id=data["event_id"]
-        ).first()
-        
-        if existing:
-            return jsonify({"error": "Sponsorship already exists for this sponsor and event"}), 400
-        
         # Create sponsorship
         sponsorship = Sponsorship(
             sponsor_id=data["sponsor_id"],
@@ -73,26 +92,114 @@ def add_sponsorship():
         )
         
         db.session.add(sponsorship)
+        refresh_sponsor_rollups({sponsorship.sponsor_id})
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Sponsorship created successfully",
             "sponsorship": {
                 "id": sponsorship.id,
                 "sponsor_id": sponsorship.sponsor_id,
-                "sponsor_name": sponsor.name,
+                "sponsor_name": sponsor_name,
                 "event_id": sponsorship.event_id,
-                "event_name": event.name,
+                "event_name": event_name,
                 "amount": float(sponsorship.amount),
                 "status": sponsorship.status,
                 "roi": float(sponsorship.roi) if sponsorship.roi else 0.0
             }
         }), 201
         
+    except IntegrityError:
+        # The unique sponsor/event constraint rejected a duplicate
+        db.session.rollback()
+        return jsonify({"error": "Sponsorship already exists for this sponsor and event"}), 400
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to create sponsorship: {str(e)}"}), 500
 
+@sponsorships_bp.route("/bulk", methods=["POST"])
+@login_required
+@require_role('admin', 'finance')
+@log_api_access
+def add_sponsorships_bulk():
+    """Create many sponsorships in one multi-row INSERT and a single commit"""
+    data = get_json_body()
+    
+    if not data or not isinstance(data, list):
+        return jsonify({"error": "Request body must be a non-empty list of sponsorships"}), 400
+    
+    if len(data) > BULK_INSERT_LIMIT:
+        return jsonify({"error": f"At most {BULK_INSERT_LIMIT} sponsorships can be created per request"}), 400
+    
+    # Validate every item before touching the database
+    rows = []
+    pairs = set()
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            error = "Sponsorship must be an object"
+        elif not isinstance(item.get("sponsor_id"), int) or not isinstance(item.get("event_id"), int):
+            error = "Sponsor ID and Event ID are required"
+        elif not validate_positive_number(item.get("amount", 0)):
+            error = "Amount must be a positive number"
+        elif not validate_status(item.get("status", "negotiating")):
+            error = "Invalid status. Must be: negotiating, confirmed, paid, or cancelled"
+        elif not isinstance(item.get("roi", 0.0), (int, float)) or isinstance(item.get("roi"), bool):
+            error = "ROI must be a number"
+        elif (item["sponsor_id"], item["event_id"]) in pairs:
+            error = "Duplicate sponsor and event in request"
+        else:
+            error = None
+        
+        if error:
+            return jsonify({"error": f"Sponsorship {index}: {error}", "index": index}), 400
+        
+        pairs.add((item["sponsor_id"], item["event_id"]))
+        rows.append({
+            "sponsor_id": item["sponsor_id"],
+            "event_id": item["event_id"],
+            "amount": float(item.get("amount", 0)),
+            "status": item.get("status", "negotiating"),
+            "roi": float(item.get("roi", 0.0))
+        })
+    
+    try:
+        # Check every referenced sponsor and event in one round trip
+        sponsor_ids = {row["sponsor_id"] for row in rows}
+        event_ids = {row["event_id"] for row in rows}
+        found = db.session.execute(
+            select(literal("sponsor"), Sponsor.id).where(Sponsor.id.in_(sponsor_ids))
+            .union_all(select(literal("event"), Event.id).where(Event.id.in_(event_ids)))
+        ).all()
+        missing_sponsors = sponsor_ids - {row_id for kind, row_id in found if kind == "sponsor"}
+        missing_events = event_ids - {row_id for kind, row_id in found if kind == "event"}
+        
+        if missing_sponsors:
+            return jsonify({"error": "Sponsor not found", "sponsor_ids": sorted(missing_sponsors)}), 404
+        
+        if missing_events:
+            return jsonify({"error": "Event not found", "event_ids": sorted(missing_events)}), 404
+        
+        db.session.execute(insert(Sponsorship), rows)
+        refresh_sponsor_rollups(sponsor_ids)
+        db.session.commit()
+        invalidate_analytics_cache()
+        
+        return jsonify({
+            "message": "Sponsorships added successfully",
+            "created": len(rows)
+        }), 201
+        
+    except IntegrityError:
+        # The unique sponsor/event constraint rejected an existing pair
+        db.session.rollback()
+        return jsonify({"error": "One or more sponsorships already exist for these sponsors and events"}), 400
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to create sponsorships: {str(e)}"}), 500
+
 @sponsorships_bp.route("/", methods=["GET"])
 @login_required
 @log_api_access
@@ -104,35 +211,37 @@ def get_sponsorships():
         event_id = request.args.get('event_id', type=int)
         status = request.args.get('status')
         
-        query = Sponsorship.query
+        # Plain rows shaped like the response, with sponsor and event names
+        # joined in, instead of ORM objects copied into dicts
+        query = select(
+            Sponsorship.id,
+            Sponsorship.sponsor_id,
+            Sponsor.name.label("sponsor_name"),
+            Sponsorship.event_id,
+            Event.name.label("event_name"),
+            func.coalesce(Sponsorship.amount, 0).label("amount"),
+            Sponsorship.status,
+            func.coalesce(Sponsorship.roi, 0).label("roi"),
+            Sponsorship.created_at
+        ).outerjoin(Sponsor, Sponsorship.sponsor_id == Sponsor.id)\
+            .outerjoin(Event, Sponsorship.event_id == Event.id)
         
         # Apply filters
         if sponsor_id:
-            query = query.filter(Sponsorship.sponsor_id == sponsor_id)
+            query = query.where(Sponsorship.sponsor_id == sponsor_id)
         if event_id:
-            query = query.filter(Sponsorship.event_id == event_id)
+            query = query.where(Sponsorship.event_id == event_id)
         if status:
             if not validate_status(status):
                 return jsonify({"error": "Invalid status filter"}), 400
-            query = query.filter(Sponsorship.status == status)
-        
-        sponsorships = query.order_by(Sponsorship.created_at.desc()).all()
-        
-        result = []
-        for sp in sponsorships:
-            result.append({
-                "id": sp.id,
-                "sponsor_id": sp.sponsor_id,
-                "sponsor_name": sp.sponsor.name if sp.sponsor else None,
-                "event_id": sp.event_id,
-                "event_name": sp.event.name if sp.event else None,
-                "amount": float(sp.amount) if sp.amount else 0.0,
-                "status": sp.status,
-                "roi": float(sp.roi) if sp.roi else 0.0,
-                "created_at": sp.created_at.isoformat() if hasattr(sp, 'created_at') and sp.created_at else None
-            })
-        
-        return jsonify(result)
+            query = query.where(Sponsorship.status == status)
+        
+        rows = db.session.execute(
+            query.order_by(Sponsorship.created_at.desc())
+            .execution_options(yield_per=STREAM_CHUNK_SIZE)
+        ).mappings()
+        
+        return stream_json_array(rows, dict)
         
     except Exception as e:
         return jsonify({"error": f"Failed to fetch sponsorships: {str(e)}"}), 500
@@ -143,7 +252,9 @@ def get_sponsorships():
 def get_sponsorship(sponsorship_id):
     """Get a specific sponsorship by ID"""
     try:
-        sponsorship = Sponsorship.query.get_or_404(sponsorship_id)
+        sponsorship = db.session.get(Sponsorship, sponsorship_id)
+        if sponsorship is None:
+            return jsonify({"error": "Sponsorship not found"}), 404
         
         return jsonify({
             "id": sponsorship.id,
@@ -154,7 +265,7 @@ def get_sponsorship(sponsorship_id):
             "amount": float(sponsorship.amount) if sponsorship.amount else 0.0,
             "status": sponsorship.status,
             "roi": float(sponsorship.roi) if sponsorship.roi else 0.0,
-            "created_at": sponsorship.created_at.isoformat() if hasattr(sponsorship, 'created_at') and sponsorship.created_at else None
+            "created_at": sponsorship.created_at
         })
         
     except Exception as e:
@@ -167,12 +278,14 @@ def get_sponsorship(sponsorship_id):
 def update_sponsorship(sponsorship_id):
     """Update a sponsorship"""
     try:
-        data = request.json
+        data = get_json_body()
         
         if not data:
             return jsonify({"error": "Request body is required"}), 400
         
-        sponsorship = Sponsorship.query.get_or_404(sponsorship_id)
+        sponsorship = db.session.get(Sponsorship, sponsorship_id)
+        if sponsorship is None:
+            return jsonify({"error": "Sponsorship not found"}), 404
         
         # Update amount if provided
         if "amount" in data:
@@ -190,7 +303,9 @@ def update_sponsorship(sponsorship_id):
         if "roi" in data:
             sponsorship.roi = float(data["roi"])
         
+        refresh_sponsor_rollups({sponsorship.sponsor_id})
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({
             "message": "Sponsorship updated successfully",
@@ -217,10 +332,14 @@ def update_sponsorship(sponsorship_id):
 def delete_sponsorship(sponsorship_id):
     """Delete a sponsorship"""
     try:
-        sponsorship = Sponsorship.query.get_or_404(sponsorship_id)
+        sponsorship = db.session.get(Sponsorship, sponsorship_id)
+        if sponsorship is None:
+            return jsonify({"error": "Sponsorship not found"}), 404
         
         db.session.delete(sponsorship)
+        refresh_sponsor_rollups({sponsorship.sponsor_id})
         db.session.commit()
+        invalidate_analytics_cache()
         
         return jsonify({"message": "Sponsorship deleted successfully"})
         
@@ -231,6 +350,7 @@ def delete_sponsorship(sponsorship_id):
 @sponsorships_bp.route("/stats", methods=["GET"])
 @login_required
 @log_api_access
+@cache.cached(timeout=STATS_CACHE_TIMEOUT, key_prefix='sponsorship_stats', response_filter=is_cacheable_response)
 def get_sponsorship_stats():
     """Get sponsorship statistics"""
     try:
@@ -271,25 +391,34 @@ def get_sponsorships_by_sponsor(sponsor_id):
     """Get all sponsorships for a specific sponsor"""
     try:
         # Verify sponsor exists
-        sponsor = Sponsor.query.get_or_404(sponsor_id)
-        
-        sponsorships = Sponsorship.query.filter_by(sponsor_id=sponsor_id)\
-            .order_by(Sponsorship.created_at.desc()).all()
-        
-        result = []
-        for sp in sponsorships:
-            result.append({
-                "id": sp.id,
-                "sponsor_id": sp.sponsor_id,
-                "sponsor_name": sponsor.name,
-                "event_id": sp.event_id,
-                "event_name": sp.event.name if sp.event else None,
-                "event_date": sp.event.date.isoformat() if sp.event and sp.event.date else None,
-                "amount": float(sp.amount) if sp.amount else 0.0,
-                "status": sp.status,
-                "roi": float(sp.roi) if sp.roi else 0.0,
-                "created_at": sp.created_at.isoformat() if hasattr(sp, 'created_at') and sp.created_at else None
-            })
+        sponsor = db.session.get(Sponsor, sponsor_id)
+        if sponsor is None:
+            return jsonify({"error": "Sponsor not found"}), 404
+        
+        # Rows plus the sponsor's total as a window SUM in the same statement
+        rows = db.session.execute(
+            select(
+                Sponsorship.id, Sponsorship.event_id, Event.name, Event.date,
+                func.coalesce(Sponsorship.amount, 0), Sponsorship.status,
+                func.coalesce(Sponsorship.roi, 0), Sponsorship.created_at,
+                func.coalesce(func.sum(Sponsorship.amount).over(), 0)
+            ).outerjoin(Event, Sponsorship.event_id == Event.id)
+            .where(Sponsorship.sponsor_id == sponsor_id)
+            .order_by(Sponsorship.created_at.desc())
+        ).all()
+        
+        result = [{
+            "id": sponsorship_id,
+            "sponsor_id": sponsor.id,
+            "sponsor_name": sponsor.name,
+            "event_id": event_id,
+            "event_name": event_name,
+            "event_date": event_date,
+            "amount": amount,
+            "status": status,
+            "roi": roi,
+            "created_at": created_at
+        } for sponsorship_id, event_id, event_name, event_date, amount, status, roi, created_at, _ in rows]
         
         return jsonify({
             "sponsor": {
@@ -298,13 +427,33 @@ def get_sponsorships_by_sponsor(sponsor_id):
                 "industry": sponsor.industry
             },
             "sponsorships": result,
-            "total_amount": sum(sp["amount"] for sp in result),
+            "total_amount": float(rows[0][-1]) if rows else 0.0,
             "sponsorship_count": len(result)
         })
         
     except Exception as e:
         return jsonify({"error": f"Failed to fetch sponsor sponsorships: {str(e)}"}), 500
 
+@sponsorships_bp.route("/by-sponsor/<int:sponsor_id>/totals", methods=["GET"])
+@login_required
+@log_api_access
+def get_sponsor_totals(sponsor_id):
+    """Get sponsorship count and total for a sponsor without listing rows"""
+    try:
+        if db.session.get(Sponsor, sponsor_id) is None:
+            return jsonify({"error": "Sponsor not found"}), 404
+        
+        count, total = sponsorship_totals(sponsor_id=sponsor_id)
+        
+        return jsonify({
+            "sponsor_id": sponsor_id,
+            "total_amount": total,
+            "sponsorship_count": count
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch sponsor totals: {str(e)}"}), 500
+
 @sponsorships_bp.route("/by-event/<int:event_id>", methods=["GET"])
 @login_required
 @log_api_access
@@ -312,38 +461,67 @@ def get_sponsorships_by_event(event_id):
     """Get all sponsorships for a specific event"""
     try:
         # Verify event exists
-        event = Event.query.get_or_404(event_id)
-        
-        sponsorships = Sponsorship.query.filter_by(event_id=event_id)\
-            .order_by(Sponsorship.created_at.desc()).all()
-        
-        result = []
-        for sp in sponsorships:
-            result.append({
-                "id": sp.id,
-                "sponsor_id": sp.sponsor_id,
-                "sponsor_name": sp.sponsor.name if sp.sponsor else None,
-                "sponsor_industry": sp.sponsor.industry if sp.sponsor else None,
-                "event_id": sp.event_id,
-                "event_name": event.name,
-                "event_date": event.date.isoformat() if event.date else None,
-                "amount": float(sp.amount) if sp.amount else 0.0,
-                "status": sp.status,
-                "roi": float(sp.roi) if sp.roi else 0.0,
-                "created_at": sp.created_at.isoformat() if hasattr(sp, 'created_at') and sp.created_at else None
-            })
+        event = db.session.get(Event, event_id)
+        if event is None:
+            return jsonify({"error": "Event not found"}), 404
+        
+        # Rows plus the event's total as a window SUM in the same statement
+        rows = db.session.execute(
+            select(
+                Sponsorship.id, Sponsorship.sponsor_id, Sponsor.name, Sponsor.industry,
+                func.coalesce(Sponsorship.amount, 0), Sponsorship.status,
+                func.coalesce(Sponsorship.roi, 0), Sponsorship.created_at,
+                func.coalesce(func.sum(Sponsorship.amount).over(), 0)
+            ).outerjoin(Sponsor, Sponsorship.sponsor_id == Sponsor.id)
+            .where(Sponsorship.event_id == event_id)
+            .order_by(Sponsorship.created_at.desc())
+        ).all()
+        
+        result = [{
+            "id": sponsorship_id,
+            "sponsor_id": sponsor_id,
+            "sponsor_name": sponsor_name,
+            "sponsor_industry": sponsor_industry,
+            "event_id": event.id,
+            "event_name": event.name,
+            "event_date": event.date,
+            "amount": amount,
+            "status": status,
+            "roi": roi,
+            "created_at": created_at
+        } for sponsorship_id, sponsor_id, sponsor_name, sponsor_industry, amount, status, roi, created_at, _ in rows]
         
         return jsonify({
             "event": {
                 "id": event.id,
                 "name": event.name,
-                "date": event.date.isoformat() if event.date else None,
+                "date": event.date,
                 "budget": float(event.budget) if event.budget else 0.0
             },
             "sponsorships": result,
-            "total_sponsorship": sum(sp["amount"] for sp in result),
+            "total_sponsorship": float(rows[0][-1]) if rows else 0.0,
             "sponsorship_count": len(result)
         })
         
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch event sponsorships: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to fetch event sponsorships: {str(e)}"}), 500
+
+@sponsorships_bp.route("/by-event/<int:event_id>/totals", methods=["GET"])
+@login_required
+@log_api_access
+def get_event_totals(event_id):
+    """Get sponsorship count and total for an event without listing rows"""
+    try:
+        if db.session.get(Event, event_id) is None:
+            return jsonify({"error": "Event not found"}), 404
+        
+        count, total = sponsorship_totals(event_id=event_id)
+        
+        return jsonify({
+            "event_id": event_id,
+            "total_sponsorship": total,
+            "sponsorship_count": count
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Failed to fetch event totals: {str(e)}"}), 500
\ No newline at end of file
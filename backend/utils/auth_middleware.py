@@ -2,28 +2,88 @@
 Authentication Decorators and Middleware for Finance Committee Platform
 """
 
-from functools import wraps
+from collections import defaultdict, deque
+from functools import lru_cache, wraps
+import atexit
+import hashlib
+import hmac
+import logging
+import logging.handlers
+import os
+import queue
+import threading
 import time
-from flask import request, jsonify, session
+import redis
+from flask import current_app, request, jsonify, session, g
 from flask_login import login_required, current_user
+from app import db
 from models import FCMember
 
+# API access records are only enqueued on the request thread; a listener
+# thread passes them on to the handlers configured on the logger's ancestors,
+# exactly as propagation would. Direct propagation is off so records are not
+# also handled synchronously. The listener is started lazily in each process,
+# so workers forked after import get their own thread and queue
+_api_logger = logging.getLogger('api')
+_api_logger.propagate = False
+_api_log_lock = threading.Lock()
+_api_log_pid = None
+
+class _PropagatingHandler(logging.Handler):
+    """Hand a dequeued record to the api logger's parent and its handlers"""
+    def emit(self, record):
+        _api_logger.parent.handle(record)
+
+def _start_api_log_listener():
+    """Start this process's queue listener, replacing any inherited across a fork"""
+    global _api_log_pid
+    with _api_log_lock:
+        if _api_log_pid == os.getpid():
+            return
+        log_queue = queue.SimpleQueue()
+        for handler in list(_api_logger.handlers):
+            _api_logger.removeHandler(handler)
+        _api_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, _PropagatingHandler())
+        listener.start()
+        atexit.register(listener.stop)
+        _api_log_pid = os.getpid()
+
+def load_user_context():
+    """
+    Resolve the current user's id and role onto g once per request
+    Later checks read g.user_id / g.user_role instead of going back through
+    the current_user proxy; both are None for anonymous requests
+    """
+    if 'user_role' not in g:
+        if current_user.is_authenticated:
+            g.user_id, g.user_role = current_user.id, current_user.role
+        else:
+            g.user_id = g.user_role = None
+    return g.user_role
+
 def require_role(*roles):
     """
     Decorator to require specific user roles
     Usage: @require_role('admin', 'finance')
     """
+    # Resolved once per decorated view rather than on every request
+    role_set = frozenset(roles)
+    denied_message = "Access denied. Required roles: " + ", ".join(roles)
+    required_roles = list(roles)
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated:
+            role = load_user_context()
+            if g.user_id is None:
                 return jsonify({"error": "Authentication required"}), 401
             
-            if current_user.role not in roles:
+            if role not in role_set:
                 return jsonify({
-                    "error": "Access denied. Required roles: " + ", ".join(roles),
-                    "required_roles": roles,
-                    "current_role": current_user.role
+                    "error": denied_message,
+                    "required_roles": required_roles,
+                    "current_role": role
                 }), 403
             
             return f(*args, **kwargs)
@@ -38,14 +98,32 @@ def admin_required(f):
     @wraps(f)
     @login_required
     def decorated_function(*args, **kwargs):
-        if current_user.role != 'admin':
+        role = load_user_context()
+        if role != 'admin':
             return jsonify({
                 "error": "Admin access required",
-                "current_role": current_user.role
+                "current_role": role
             }), 403
         return f(*args, **kwargs)
     return decorated_function
 
+@lru_cache(maxsize=8)
+def _api_key_digests(api_keys):
+    """SHA-256 digests of the configured API keys, computed once per key set"""
+    return tuple(hashlib.sha256(key.encode()).digest() for key in api_keys)
+
+def is_valid_api_key(api_key):
+    """
+    Check an API key against Config.API_KEYS in constant time
+    Every configured key is compared, so timing reveals neither which key
+    matched nor how much of one did
+    """
+    digest = hashlib.sha256(api_key.encode()).digest()
+    valid = False
+    for key_digest in _api_key_digests(current_app.config['API_KEYS']):
+        valid |= hmac.compare_digest(digest, key_digest)
+    return valid
+
 def api_key_required(f):
     """
     Decorator to require valid API key
@@ -56,10 +134,7 @@ def api_key_required(f):
         # Get API key from header or query parameter
         api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
         
-        # In production, validate against database or config
-        valid_api_keys = ['finance-committee-2024']  # Move to config
-        
-        if not api_key or api_key not in valid_api_keys:
+        if not api_key or not is_valid_api_key(api_key):
             return jsonify({
                 "error": "Valid API key required"
             }), 401
@@ -67,6 +142,15 @@ def api_key_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def get_json_body():
+    """
+    Get the request's JSON body, parsed at most once and shared via g
+    Returns None when the body is missing or not valid JSON
+    """
+    if 'json' not in g:
+        g.json = request.get_json(cache=True, silent=True)
+    return g.json
+
 def validate_json(required_fields=None, optional_fields=None):
     """
     Decorator to validate JSON request body
@@ -78,7 +162,7 @@ def validate_json(required_fields=None, optional_fields=None):
             if not request.is_json:
                 return jsonify({"error": "JSON content type required"}), 400
             
-            data = request.get_json()
+            data = get_json_body()
             if not data:
                 return jsonify({"error": "Request body is required"}), 400
             
@@ -112,46 +196,91 @@ def validate_json(required_fields=None, optional_fields=None):
         return decorated_function
     return decorator
 
+_redis_client = None
+
+def _get_redis():
+    """Get the shared Redis client, or None when REDIS_URL is not configured"""
+    global _redis_client
+    url = current_app.config.get('REDIS_URL')
+    if not url:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(url)
+    return _redis_client
+
+# Seconds between sweeps that drop idle clients from the in-memory limiter
+RATE_LIMIT_CLEANUP_INTERVAL = 300
+
 def rate_limit(max_requests=100, window_seconds=3600):
     """
-    Decorator to implement rate limiting (basic in-memory implementation)
+    Decorator to implement rate limiting
+    Counts are shared across workers in Redis when REDIS_URL is set, with a
+    per-process in-memory fallback
     Usage: @rate_limit(10, 60)  # 10 requests per minute
     """
     def decorator(f):
+        # In-memory fallback: each client's last max_requests timestamps; the
+        # deque evicts the oldest on append, so the head is the window check
+        requests = defaultdict(lambda: deque(maxlen=max_requests))
+        last_cleanup = [time.time()]
+        
         @wraps(f)
         def decorated_function(*args, **kwargs):
             # Get client identifier (IP address or user ID)
             client_id = request.remote_addr
-            if current_user.is_authenticated:
-                client_id = f"user_{current_user.id}"
+            load_user_context()
+            if g.user_id is not None:
+                client_id = f"user_{g.user_id}"
             
-            # Simple in-memory rate limiting (in production, use Redis/Memcached)
-            if not hasattr(rate_limit, '_requests'):
-                rate_limit._requests = {}
+            # Fixed-window counter: one INCR+EXPIRE round trip per request
+            client = _get_redis()
+            if client is not None:
+                now = time.time()
+                window = int(now // window_seconds)
+                key = f"rl:{f.__module__}.{f.__name__}:{client_id}:{window}"
+                try:
+                    pipe = client.pipeline()
+                    pipe.incr(key)
+                    pipe.expire(key, window_seconds)
+                    count, _ = pipe.execute()
+                except redis.RedisError:
+                    count = None  # Redis unavailable; fall back to in-memory
+                
+                if count is not None:
+                    if count > max_requests:
+                        retry_after = int((window + 1) * window_seconds - now) + 1
+                        return jsonify({
+                            "error": "Rate limit exceeded",
+                            "limit": max_requests,
+                            "window": window_seconds,
+                            "retry_after": retry_after
+                        }), 429, {"Retry-After": str(retry_after)}
+                    
+                    return f(*args, **kwargs)
             
+            # Simple in-memory rate limiting, per process
             now = int(time.time())
             window_start = now - window_seconds
             
-            if client_id not in rate_limit._requests:
-                rate_limit._requests[client_id] = []
+            # Periodically forget clients with no requests left in the window
+            if now - last_cleanup[0] >= RATE_LIMIT_CLEANUP_INTERVAL:
+                last_cleanup[0] = now
+                for idle_client, timestamps in list(requests.items()):
+                    if not timestamps or timestamps[-1] <= window_start:
+                        requests.pop(idle_client, None)
             
-            # Remove old requests outside the window
-            rate_limit._requests[client_id] = [
-                req_time for req_time in rate_limit._requests[client_id] 
-                if req_time > window_start
-            ]
-            
-            # Check if limit exceeded
-            if len(rate_limit._requests[client_id]) >= max_requests:
+            # Limit exceeded if the oldest of the last max_requests is in the window
+            timestamps = requests[client_id]
+            if len(timestamps) == max_requests and timestamps[0] > window_start:
                 return jsonify({
                     "error": "Rate limit exceeded",
                     "limit": max_requests,
                     "window": window_seconds,
-                    "retry_after": window_seconds - (now - rate_limit._requests[client_id][0])
+                    "retry_after": window_seconds - (now - timestamps[0])
                 }), 429
             
             # Add current request
-            rate_limit._requests[client_id].append(now)
+            timestamps.append(now)
             
             return f(*args, **kwargs)
         return decorated_function
@@ -164,22 +293,26 @@ def log_api_access(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        import logging
-        from datetime import datetime
+        # Skip building the record entirely when API logging is off
+        if not _api_logger.isEnabledFor(logging.INFO):
+            return f(*args, **kwargs)
+        
+        if _api_log_pid != os.getpid():
+            _start_api_log_listener()
         
-        # Log request details
+        # Log request details; the record's own time serves as the timestamp
+        load_user_context()
         log_data = {
-            'timestamp': datetime.utcnow().isoformat(),
             'method': request.method,
             'endpoint': request.endpoint,
             'path': request.path,
             'remote_addr': request.remote_addr,
             'user_agent': request.headers.get('User-Agent'),
-            'user_id': current_user.id if current_user.is_authenticated else None,
+            'user_id': g.user_id,
             'content_length': request.content_length
         }
         
-        logging.info(f"API Access: {log_data}")
+        _api_logger.info("API Access: %s", log_data)
         
         return f(*args, **kwargs)
     return decorated_function
@@ -243,13 +376,26 @@ def get_user_context():
         }
     return None
 
+def get_user_by_id(user_id):
+    """
+    Get a member by id, cached for the rest of the request
+    Reuses the already-loaded current_user; returns None if not found
+    """
+    users = g.setdefault('users_by_id', {})
+    if user_id not in users:
+        if current_user.is_authenticated and current_user.id == user_id:
+            users[user_id] = current_user._get_current_object()
+        else:
+            users[user_id] = db.session.get(FCMember, user_id)
+    return users[user_id]
+
 def is_admin():
     """Check if current user is admin"""
-    return current_user.is_authenticated and current_user.role == 'admin'
+    return load_user_context() == 'admin'
 
 def is_finance_member():
     """Check if current user is finance member"""
-    return current_user.is_authenticated and current_user.role == 'finance'
+    return load_user_context() == 'finance'
 
 def has_permission(permission):
     """Check if current user has specific permission"""
@@ -262,4 +408,5 @@ def has_permission(permission):
     }
     
     user_permissions = permissions.get(permission, [])
-    return current_user.is_authenticated and current_user.role in user_permissions
\ No newline at end of file
+    role = load_user_context()
+    return g.user_id is not None and role in user_permissions
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Response Caching Helpers for Finance Committee Platform
+"""
+
+import time
+from app import cache
+
+# Keys of the cached analytics and statistics responses, dropped whenever the
+# data they aggregate changes
+ANALYTICS_CACHE_KEYS = (
+    'analytics_overview',
+    'analytics_trends',
+    'analytics_roi',
+    'analytics_reports',
+    'analytics_dashboard',
+    'sponsorship_stats'
+)
+
+# Seconds after a write during which analytics read from the primary instead
+# of the read replica, so replica lag can't be cached as fresh data
+REPLICA_LAG_WINDOW = 5
+RECENT_WRITE_KEY = 'analytics_recent_write'
+
+# Bumped on every analytics-relevant write so in-process memoized aggregates
+# keyed on it are recomputed
+_generation = 0
+
+# Seconds after which memo keys roll over even without a local write
+GENERATION_TTL = 60
+
+def get_generation():
+    """Current data generation combined with a time bucket, for memo keys.
+    The bucket bounds staleness when another worker process did the write."""
+    return _generation, int(time.monotonic() // GENERATION_TTL)
+
+def bump_generation():
+    """Mark in-process memoized aggregates as stale"""
+    global _generation
+    _generation += 1
+
+def is_cacheable_response(response):
+    """Only cache successful responses; error tuples are always recomputed"""
+    return not isinstance(response, tuple)
+
+def invalidate_analytics_cache():
+    """
+    Drop cached analytics after a write to events, sponsors, sponsorships or users
+    The response cache is shared when CACHE_TYPE is (e.g.) RedisCache, but the
+    generation is per process: other workers' memoized aggregates can stay
+    stale for up to GENERATION_TTL seconds after the write
+    """
+    cache.delete_many(*ANALYTICS_CACHE_KEYS)
+    cache.set(RECENT_WRITE_KEY, True, timeout=REPLICA_LAG_WINDOW)
+    bump_generation()
+
+def has_recent_write():
+    """True within REPLICA_LAG_WINDOW seconds of the last analytics-relevant write"""
+    return cache.get(RECENT_WRITE_KEY) is not None
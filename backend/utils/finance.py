@@ -3,11 +3,111 @@ Finance Utility Functions
 Provides financial calculations, ROI analysis, and budget optimization for the Finance Committee Platform.
 """
 
-from datetime import datetime, timedelta
+from copy import deepcopy
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
-from models import Sponsor, Event, Sponsorship
-from sqlalchemy import func
+from models import Sponsor, SponsorRollup, Event, Sponsorship
+from sqlalchemy import Float, and_, bindparam, case, func, select, type_coerce
+from sqlalchemy.exc import SQLAlchemyError
 from app import db
+from utils.cache import get_generation
+
+# Result keys for get_top_performing_sponsors, in query column order
+_TOP_SPONSOR_KEYS = (
+    'id', 'name', 'industry', 'contact_person', 'email',
+    'total_investment', 'sponsorship_count', 'average_roi'
+)
+
+# Calendar months of history the financial projections are based on
+PROJECTION_HISTORY_MONTHS = 6
+
+def month_window_start(end_date: datetime, months: int) -> datetime:
+    """Start of the window covering `months` calendar months up to end_date"""
+    return end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0) - relativedelta(months=months - 1)
+
+def _growth(current, previous):
+    """Percentage change from previous to current; 0 when there is no baseline"""
+    return ((current - previous) / previous) * 100 if previous > 0 else 0
+
+# Completed sponsorship totals for one sponsor, optionally limited to one event;
+# built once at import with bound parameters instead of per call
+_SPONSOR_ROI_STMT = select(
+    func.count(Sponsorship.id),
+    func.sum(Sponsorship.amount),
+    func.sum(Sponsorship.revenue_generated)
+).where(
+    Sponsorship.sponsor_id == bindparam('sponsor_id'),
+    Sponsorship.status == 'completed'
+)
+_SPONSOR_EVENT_ROI_STMT = _SPONSOR_ROI_STMT.where(Sponsorship.event_id == bindparam('event_id'))
+
+@lru_cache(maxsize=512)
+def _sponsor_roi_totals(sponsor_id: int, event_id: Optional[int], generation) -> Tuple[int, float, float]:
+    """Completed sponsorship count, investment and revenue; memoized per data generation"""
+    if event_id:
+        stmt, params = _SPONSOR_EVENT_ROI_STMT, {'sponsor_id': sponsor_id, 'event_id': event_id}
+    else:
+        stmt, params = _SPONSOR_ROI_STMT, {'sponsor_id': sponsor_id}
+    
+    sponsorship_count, total_investment, total_revenue = db.session.execute(stmt, params).one()
+    return sponsorship_count, float(total_investment or 0), float(total_revenue or 0)
+
+@lru_cache(maxsize=32)
+def _trends_for(months: int, generation) -> Dict:
+    """Run the monthly trend queries; memoized per data generation"""
+    # Window covering exactly `months` calendar months, the current one included
+    end_date = datetime.now()
+    start_date = month_window_start(end_date, months)
+    
+    # Bucket events in the date range by month in the database
+    month = func.date_format(Event.date, '%Y-%m')
+    in_range = (Event.date >= start_date, Event.date <= end_date)
+    
+    event_months = db.session.query(
+        month,
+        func.sum(Event.budget),
+        func.sum(Event.revenue),
+        func.count(Event.id)
+    ).filter(*in_range).group_by(month).order_by(month).all()
+    
+    if not event_months:
+        return {'error': 'No events found in the specified period'}
+    
+    # Completed sponsorship totals for the same months
+    sponsorship_totals = dict(db.session.query(
+        month,
+        func.sum(Sponsorship.amount)
+    ).join(
+        Event, Sponsorship.event_id == Event.id
+    ).filter(
+        *in_range,
+        Sponsorship.status == 'completed'
+    ).group_by(month).all())
+    
+    trend_data = [{
+        'month': month_key,
+        'total_budget': float(total_budget or 0),
+        'total_revenue': float(total_revenue or 0),
+        'event_count': event_count,
+        'total_sponsorship': sponsorship_totals.get(month_key, 0)
+    } for month_key, total_budget, total_revenue, event_count in event_months]
+    
+    # Calculate growth rates between consecutive months
+    for prev_month, curr_month in zip(trend_data, trend_data[1:]):
+        curr_month['revenue_growth'] = _growth(curr_month['total_revenue'], prev_month['total_revenue'])
+        curr_month['event_growth'] = _growth(curr_month['event_count'], prev_month['event_count'])
+    
+    return {
+        'period_months': months,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'monthly_trends': trend_data,
+        'total_events': sum(m['event_count'] for m in trend_data),
+        'total_budget': sum(m['total_budget'] for m in trend_data),
+        'total_revenue': sum(m['total_revenue'] for m in trend_data)
+    }
 
 class FinanceCalculator:
     """Handles financial calculations and analysis."""
@@ -42,39 +142,23 @@ class FinanceCalculator:
             Dictionary with ROI metrics
         """
         try:
-            query = db.session.query(Sponsorship).filter(Sponsorship.sponsor_id == sponsor_id)
-            
-            if event_id:
-                query = query.filter(Sponsorship.event_id == event_id)
-            
-            sponsorships = query.filter(Sponsorship.status == 'completed').all()
-            
-            total_investment = sum(s.amount for s in sponsorships)
-            total_revenue = 0  # This would need to be calculated based on actual event data
-            
-            # Placeholder for revenue calculation - in real implementation, 
-            # you'd calculate this based on event performance metrics
-            for sponsorship in sponsorships:
-                # Example: revenue = investment * (1 + ROI/100)
-                if sponsorship.roi:
-                    total_revenue += sponsorship.amount * (1 + sponsorship.roi / 100)
-                else:
-                    total_revenue += sponsorship.amount
-            
-            roi_percentage = FinanceCalculator.calculate_roi(total_investment, total_revenue)
-            
-            return {
-                'sponsor_id': sponsor_id,
-                'event_id': event_id,
-                'total_investment': total_investment,
-                'total_revenue': total_revenue,
-                'roi_percentage': roi_percentage,
-                'sponsorship_count': len(sponsorships),
-                'net_profit': total_revenue - total_investment
-            }
-            
-        except Exception as e:
+            sponsorship_count, total_investment, total_revenue = _sponsor_roi_totals(
+                sponsor_id, event_id, get_generation()
+            )
+        except SQLAlchemyError as e:
             return {'error': f'Failed to calculate sponsor ROI: {str(e)}'}
+        
+        roi_percentage = FinanceCalculator.calculate_roi(total_investment, total_revenue)
+        
+        return {
+            'sponsor_id': sponsor_id,
+            'event_id': event_id,
+            'total_investment': total_investment,
+            'total_revenue': total_revenue,
+            'roi_percentage': roi_percentage,
+            'sponsorship_count': sponsorship_count,
+            'net_profit': total_revenue - total_investment
+        }
     
     @staticmethod
     def get_event_financial_summary(event_id: int) -> Dict:
@@ -88,42 +172,52 @@ class FinanceCalculator:
             Dictionary with event financial metrics
         """
         try:
-            event = Event.query.get(event_id)
-            if not event:
-                return {'error': 'Event not found'}
-            
-            sponsorships = db.session.query(Sponsorship).filter(
-                Sponsorship.event_id == event_id,
-                Sponsorship.status == 'completed'
-            ).all()
-            
-            total_sponsorship = sum(s.amount for s in sponsorships)
-            total_budget = float(event.budget)
-            actual_revenue = float(event.revenue)
-            
-            # Calculate various financial metrics
-            profit_margin = FinanceCalculator.calculate_profit_margin(actual_revenue, total_budget)
-            budget_utilization = FinanceCalculator.calculate_budget_utilization(total_sponsorship, total_budget)
-            roi = FinanceCalculator.calculate_roi(total_budget, actual_revenue)
-            
-            return {
-                'event_id': event_id,
-                'event_name': event.name,
-                'event_date': event.date.isoformat(),
-                'total_budget': total_budget,
-                'actual_revenue': actual_revenue,
-                'total_sponsorship': total_sponsorship,
-                'net_profit': actual_revenue - total_budget,
-                'profit_margin_percentage': profit_margin,
-                'budget_utilization_percentage': budget_utilization,
-                'roi_percentage': roi,
-                'sponsor_count': len(sponsorships),
-                'footfall': event.footfall,
-                'revenue_per_attendee': actual_revenue / event.footfall if event.footfall > 0 else 0
-            }
-            
-        except Exception as e:
+            # Event columns and its completed sponsorship totals in one round-trip
+            row = db.session.query(
+                Event.name,
+                Event.date,
+                Event.budget,
+                Event.revenue,
+                Event.footfall,
+                func.count(Sponsorship.id),
+                func.coalesce(func.sum(Sponsorship.amount), 0)
+            ).outerjoin(
+                Sponsorship, and_(Sponsorship.event_id == Event.id, Sponsorship.status == 'completed')
+            ).filter(
+                Event.id == event_id
+            ).group_by(Event.id).first()
+        except SQLAlchemyError as e:
             return {'error': f'Failed to get event financial summary: {str(e)}'}
+        
+        if not row:
+            return {'error': 'Event not found'}
+        
+        name, event_date, budget, revenue, footfall, sponsor_count, total_sponsorship = row
+        # Budget, revenue, footfall and date are nullable columns
+        total_sponsorship = float(total_sponsorship)
+        total_budget = float(budget or 0)
+        actual_revenue = float(revenue or 0)
+        
+        # Calculate various financial metrics
+        profit_margin = FinanceCalculator.calculate_profit_margin(actual_revenue, total_budget)
+        budget_utilization = FinanceCalculator.calculate_budget_utilization(total_sponsorship, total_budget)
+        roi = FinanceCalculator.calculate_roi(total_budget, actual_revenue)
+        
+        return {
+            'event_id': event_id,
+            'event_name': name,
+            'event_date': event_date.isoformat() if event_date else None,
+            'total_budget': total_budget,
+            'actual_revenue': actual_revenue,
+            'total_sponsorship': total_sponsorship,
+            'net_profit': actual_revenue - total_budget,
+            'profit_margin_percentage': profit_margin,
+            'budget_utilization_percentage': budget_utilization,
+            'roi_percentage': roi,
+            'sponsor_count': sponsor_count,
+            'footfall': footfall,
+            'revenue_per_attendee': actual_revenue / footfall if footfall else 0
+        }
     
     @staticmethod
     def calculate_profit_margin(revenue: float, costs: float) -> float:
@@ -151,73 +245,9 @@ class FinanceCalculator:
             Dictionary with trend analysis
         """
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=months * 30)
-            
-            # Get events in the date range
-            events = Event.query.filter(
-                Event.date >= start_date,
-                Event.date <= end_date
-            ).order_by(Event.date).all()
-            
-            if not events:
-                return {'error': 'No events found in the specified period'}
-            
-            monthly_data = {}
-            for event in events:
-                month_key = event.date.strftime('%Y-%m')
-                
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {
-                        'month': month_key,
-                        'total_budget': 0,
-                        'total_revenue': 0,
-                        'event_count': 0,
-                        'total_sponsorship': 0
-                    }
-                
-                monthly_data[month_key]['total_budget'] += float(event.budget)
-                monthly_data[month_key]['total_revenue'] += float(event.revenue)
-                monthly_data[month_key]['event_count'] += 1
-                
-                # Get sponsorship data for this event
-                sponsorships = db.session.query(Sponsorship).filter(
-                    Sponsorship.event_id == event.id,
-                    Sponsorship.status == 'completed'
-                ).all()
-                
-                monthly_data[month_key]['total_sponsorship'] += sum(s.amount for s in sponsorships)
-            
-            # Calculate trends
-            trend_data = list(monthly_data.values())
-            trend_data.sort(key=lambda x: x['month'])
-            
-            # Calculate growth rates
-            for i in range(1, len(trend_data)):
-                prev_month = trend_data[i-1]
-                curr_month = trend_data[i]
-                
-                if prev_month['total_revenue'] > 0:
-                    curr_month['revenue_growth'] = ((curr_month['total_revenue'] - prev_month['total_revenue']) / prev_month['total_revenue']) * 100
-                else:
-                    curr_month['revenue_growth'] = 0
-                
-                if prev_month['event_count'] > 0:
-                    curr_month['event_growth'] = ((curr_month['event_count'] - prev_month['event_count']) / prev_month['event_count']) * 100
-                else:
-                    curr_month['event_growth'] = 0
-            
-            return {
-                'period_months': months,
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat(),
-                'monthly_trends': trend_data,
-                'total_events': len(events),
-                'total_budget': sum(event.budget for event in events),
-                'total_revenue': sum(event.revenue for event in events)
-            }
-            
-        except Exception as e:
+            # Copy so callers can't modify the memoized result
+            return deepcopy(_trends_for(months, get_generation()))
+        except SQLAlchemyError as e:
             return {'error': f'Failed to analyze financial trends: {str(e)}'}
     
     @staticmethod
@@ -232,90 +262,89 @@ class FinanceCalculator:
             List of sponsor performance data
         """
         try:
+            # Rank from the per-sponsor rollup, then join only the top rows to
+            # the sponsor columns that are reported
+            totals = db.session.query(
+                SponsorRollup.sponsor_id,
+                SponsorRollup.total_investment,
+                SponsorRollup.sponsorship_count,
+                type_coerce(case(
+                    (SponsorRollup.roi_count > 0, SponsorRollup.roi_sum / SponsorRollup.roi_count),
+                    else_=0
+                ), Float).label('avg_roi')
+            ).order_by(
+                SponsorRollup.total_investment.desc()
+            ).limit(limit).cte('totals')
+            
             sponsors_data = db.session.query(
-                Sponsor,
-                func.sum(Sponsorship.amount).label('total_investment'),
-                func.count(Sponsorship.id).label('sponsorship_count'),
-                func.avg(Sponsorship.roi).label('avg_roi')
+                Sponsor.id,
+                Sponsor.name,
+                Sponsor.industry,
+                Sponsor.contact_person,
+                Sponsor.email,
+                totals.c.total_investment,
+                totals.c.sponsorship_count,
+                totals.c.avg_roi
             ).join(
-                Sponsorship, Sponsor.id == Sponsorship.sponsor_id
-            ).filter(
-                Sponsorship.status == 'completed'
-            ).group_by(
-                Sponsor.id
+                totals, Sponsor.id == totals.c.sponsor_id
             ).order_by(
-                func.sum(Sponsorship.amount).desc()
-            ).limit(limit).all()
-            
-            results = []
-            for sponsor, total_investment, sponsorship_count, avg_roi in sponsors_data:
-                results.append({
-                    'id': sponsor.id,
-                    'name': sponsor.name,
-                    'industry': sponsor.industry,
-                    'total_investment': float(total_investment),
-                    'sponsorship_count': sponsorship_count,
-                    'average_roi': float(avg_roi) if avg_roi else 0,
-                    'contact_person': sponsor.contact_person,
-                    'email': sponsor.email
-                })
-            
-            return results
-            
-        except Exception as e:
+                totals.c.total_investment.desc()
+            ).all()
+        except SQLAlchemyError as e:
             return [{'error': f'Failed to get top sponsors: {str(e)}'}]
+        
+        return [dict(zip(_TOP_SPONSOR_KEYS, row)) for row in sponsors_data]
     
     @staticmethod
-    def generate_financial_projections(projected_months: int = 6) -> Dict:
+    def generate_financial_projections(projected_months: int = 6,
+                                       monthly_trends: Optional[List[Dict]] = None) -> Dict:
         """
         Generate financial projections based on historical data.
         
         Args:
             projected_months: Number of months to project
+            monthly_trends: Monthly trends already covering the last
+                PROJECTION_HISTORY_MONTHS months; queried when not given
             
         Returns:
             Dictionary with financial projections
         """
         try:
             # Get last 6 months of actual data for projection
-            historical_trends = FinanceCalculator.analyze_financial_trends(months=6)
-            
-            if 'error' in historical_trends:
-                return historical_trends
-            
-            monthly_data = historical_trends['monthly_trends']
+            if monthly_trends is None:
+                historical_trends = FinanceCalculator.analyze_financial_trends(months=PROJECTION_HISTORY_MONTHS)
+                
+                if 'error' in historical_trends:
+                    return historical_trends
+                
+                monthly_trends = historical_trends['monthly_trends']
             
+            first_month = month_window_start(datetime.now(), PROJECTION_HISTORY_MONTHS).strftime('%Y-%m')
+            monthly_data = [m for m in monthly_trends if m['month'] >= first_month]
+        
             if len(monthly_data) < 2:
                 return {'error': 'Insufficient historical data for projections'}
-            
+        
             # Calculate average growth rates
             revenue_growth_rates = [m.get('revenue_growth', 0) for m in monthly_data[1:]]
             avg_revenue_growth = sum(revenue_growth_rates) / len(revenue_growth_rates) if revenue_growth_rates else 0
-            
+        
             event_growth_rates = [m.get('event_growth', 0) for m in monthly_data[1:]]
             avg_event_growth = sum(event_growth_rates) / len(event_growth_rates) if event_growth_rates else 0
-            
+        
             # Get latest month as baseline
             baseline = monthly_data[-1]
-            
-            projections = []
-            current_revenue = baseline['total_revenue']
-            current_events = baseline['event_count']
-            
-            for month in range(1, projected_months + 1):
-                projected_revenue = current_revenue * (1 + avg_revenue_growth / 100)
-                projected_events = int(current_events * (1 + avg_event_growth / 100))
-                
-                projections.append({
-                    'month': month,
-                    'projected_revenue': projected_revenue,
-                    'projected_events': projected_events,
-                    'growth_assumption': avg_revenue_growth
-                })
-                
-                current_revenue = projected_revenue
-                current_events = projected_events
-            
+        
+            # Compound growth in closed form: month n is baseline * (1 + rate)^n
+            revenue_factor = 1 + avg_revenue_growth / 100
+            event_factor = 1 + avg_event_growth / 100
+            projections = [{
+                'month': month,
+                'projected_revenue': baseline['total_revenue'] * revenue_factor ** month,
+                'projected_events': int(baseline['event_count'] * event_factor ** month),
+                'growth_assumption': avg_revenue_growth
+            } for month in range(1, projected_months + 1)]
+        
             return {
                 'projection_months': projected_months,
                 'baseline_month': baseline['month'],
@@ -325,6 +354,5 @@ class FinanceCalculator:
                 'total_projected_revenue': sum(p['projected_revenue'] for p in projections),
                 'total_projected_events': sum(p['projected_events'] for p in projections)
             }
-            
         except Exception as e:
-            return {'error': f'Failed to generate financial projections: {str(e)}'}
\ No newline at end of file
+            return {'error': f'Failed to generate financial projections: {str(e)}'}
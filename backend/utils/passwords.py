@@ -0,0 +1,62 @@
+"""
+Password Hashing Helpers for Finance Committee Platform
+"""
+
+from collections import OrderedDict
+import hashlib
+import hmac
+import threading
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import current_app
+from werkzeug.security import check_password_hash
+
+_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+# Recently verified (hash, keyed password digest) pairs; a password change
+# produces a new hash, so stale entries can never match again
+VERIFIED_CACHE_SIZE = 1024
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+def _check_password(password_hash, password):
+    """Verify Argon2 hashes, falling back to werkzeug for legacy accounts"""
+    if password_hash.startswith("$argon2"):
+        try:
+            return _hasher.verify(password_hash, password)
+        except (InvalidHashError, VerificationError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def constant_time_equals(a, b):
+    """Compare two strings in time independent of where they first differ"""
+    return hmac.compare_digest(str(a).encode(), str(b).encode())
+
+def hash_password(password):
+    """Hash a new password with Argon2id; argon2-cffi releases the GIL while hashing"""
+    return _hasher.hash(password)
+
+def needs_rehash(password_hash):
+    """True for legacy werkzeug hashes or outdated Argon2 parameters"""
+    if not password_hash.startswith("$argon2"):
+        return True
+    return _hasher.check_needs_rehash(password_hash)
+
+def verify_password(password_hash, password):
+    """Check a password against its hash, skipping the KDF for recent successes"""
+    digest = hmac.new(current_app.config["SECRET_KEY"].encode(), password.encode(), hashlib.sha256).digest()
+    key = (password_hash, digest)
+    
+    with _verified_lock:
+        if key in _verified:
+            _verified.move_to_end(key)
+            return True
+    
+    if not _check_password(password_hash, password):
+        return False
+    
+    with _verified_lock:
+        _verified[key] = True
+        if len(_verified) > VERIFIED_CACHE_SIZE:
+            _verified.popitem(last=False)
+    return True
@@ -5,13 +5,257 @@ Handles PDF report generation, Excel export, and document creation for Finance C
 
 import os
 import io
+import hashlib
 import tempfile
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from flask import send_file
-from sqlalchemy import func
+from typing import Dict, List, Optional, Any, Tuple
+import numpy as np
+from flask import current_app, send_file
+from openpyxl import Workbook
+from sqlalchemy import func, select
 from models import Sponsor, Event, Sponsorship
 from app import db
+from .finance import FinanceCalculator, PROJECTION_HISTORY_MONTHS, month_window_start
+from .responses import JSONArrayStream, STREAM_CHUNK_SIZE, stream_json_object
+
+# Exported report files keyed by report type, parameters and data version. Any
+# write gives a new key, so entries never go stale; the oldest are evicted past
+# REPORT_CACHE_SIZE
+REPORT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'report_cache')
+REPORT_CACHE_SIZE = 64
+# Data written within this many seconds is exported without caching
+REPORT_CACHE_SETTLE_SECONDS = 1
+
+# Reports export_report_to_excel can cache, by their ReportGenerator method. The
+# financial summary is absent: its period ends at the current time, so its
+# content also depends on when it is generated
+CACHEABLE_REPORTS = {
+    'sponsor': 'generate_sponsor_report',
+    'event': 'generate_event_report',
+    'roi_analysis': 'generate_roi_analysis',
+    'monthly': 'generate_monthly_report'
+}
+
+# Columns read by the sponsor and event reports
+_SPONSOR_REPORT_COLUMNS = (
+    Sponsor.id, Sponsor.name, Sponsor.industry, Sponsor.contact_person,
+    Sponsor.email, Sponsor.phone, Sponsor.total_invested, Sponsor.created_at
+)
+_EVENT_REPORT_COLUMNS = (
+    Event.id, Event.name, Event.date, Event.budget,
+    Event.revenue, Event.footfall, Event.created_at
+)
+
+# Per-sponsor completed sponsorship aggregate for generate_roi_analysis; built
+# once at import so each report skips constructing and cache-keying it
+_ROI_ANALYSIS_STMT = select(
+    Sponsor.id,
+    Sponsor.name,
+    Sponsor.industry,
+    func.sum(Sponsorship.amount).label('total_investment'),
+    func.count(Sponsorship.id).label('sponsorship_count'),
+    func.avg(Sponsorship.roi).label('avg_roi'),
+    func.min(Sponsorship.roi).label('min_roi'),
+    func.max(Sponsorship.roi).label('max_roi')
+).join(
+    Sponsorship, Sponsor.id == Sponsorship.sponsor_id
+).where(
+    Sponsorship.status == 'completed'
+).group_by(
+    Sponsor.id
+)
+
+# English month names, independent of the process locale that strftime('%B') uses
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+)
+
+def _month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Half-open bounds of a calendar month: its first day and the next month's"""
+    start_date = datetime(year, month, 1)
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1)
+    else:
+        next_month = datetime(year, month + 1, 1)
+    return start_date, next_month
+
+def _monthly_events_query(start_date: datetime, next_month: datetime):
+    return select(
+        Event.id, Event.name, Event.date, Event.budget, Event.revenue, Event.footfall
+    ).where(
+        Event.date >= start_date,
+        Event.date < next_month
+    ).order_by(Event.date)
+
+def _monthly_sponsorships_query(start_date: datetime, next_month: datetime):
+    # Sponsor and event names are joined in rather than looked up per row
+    return select(
+        Sponsorship.id,
+        Sponsor.name.label('sponsor_name'),
+        Event.name.label('event_name'),
+        Sponsorship.amount,
+        Sponsorship.status,
+        Sponsorship.roi,
+        Sponsorship.created_at
+    ).outerjoin(
+        Sponsor, Sponsor.id == Sponsorship.sponsor_id
+    ).outerjoin(
+        Event, Event.id == Sponsorship.event_id
+    ).where(
+        Sponsorship.created_at >= start_date,
+        Sponsorship.created_at < next_month
+    )
+
+def _monthly_new_sponsors_query(start_date: datetime, next_month: datetime):
+    return select(
+        Sponsor.id, Sponsor.name, Sponsor.industry, Sponsor.contact_person, Sponsor.email, Sponsor.created_at
+    ).where(
+        Sponsor.created_at >= start_date,
+        Sponsor.created_at < next_month
+    )
+
+def _stream_rows(stmt):
+    """Execute a select lazily, fetching STREAM_CHUNK_SIZE rows per round trip"""
+    yield from db.session.execute(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE))
+
+def _monthly_report_header(year: int, month: int, start_date: datetime, next_month: datetime) -> Dict:
+    return {
+        'report_type': 'Monthly Report',
+        'year': year,
+        'month': month,
+        'month_name': MONTH_NAMES[month - 1],
+        'period_start': start_date.isoformat(),
+        'period_end': (next_month - timedelta(days=1)).isoformat(),
+        'generated_at': datetime.now().isoformat()
+    }
+
+def _monthly_summary_metrics(total_events, total_budget, total_revenue, total_footfall,
+                             new_sponsors, completed_sponsorships, total_sponsorship_amount) -> Dict:
+    return {
+        'total_events': total_events,
+        'total_budget': float(total_budget),
+        'total_revenue': float(total_revenue),
+        'net_profit': float(total_revenue - total_budget),
+        'total_footfall': total_footfall,
+        'new_sponsors': new_sponsors,
+        'completed_sponsorships': completed_sponsorships,
+        'total_sponsorship_amount': float(total_sponsorship_amount),
+        'roi_percentage': float(((total_revenue - total_budget) / total_budget) * 100) if total_budget > 0 else 0
+    }
+
+def _monthly_event(event) -> Dict:
+    return {
+        'id': event.id,
+        'name': event.name,
+        'date': event.date,
+        'budget': float(event.budget),
+        'revenue': float(event.revenue),
+        'footfall': event.footfall,
+        'profit': float(event.revenue - event.budget)
+    }
+
+def _monthly_new_sponsor(sponsor) -> Dict:
+    return {
+        'id': sponsor.id,
+        'name': sponsor.name,
+        'industry': sponsor.industry,
+        'contact_person': sponsor.contact_person,
+        'email': sponsor.email,
+        'created_at': sponsor.created_at
+    }
+
+def _monthly_sponsorship(sponsorship) -> Dict:
+    return {
+        'id': sponsorship.id,
+        'sponsor_name': sponsorship.sponsor_name if sponsorship.sponsor_name is not None else 'Unknown',
+        'event_name': sponsorship.event_name if sponsorship.event_name is not None else 'Unknown',
+        'amount': float(sponsorship.amount),
+        'status': sponsorship.status,
+        'roi': float(sponsorship.roi) if sponsorship.roi else 0,
+        'created_at': sponsorship.created_at
+    }
+
+def _excel_cell(value):
+    """Cell value for openpyxl; nested structures are written as JSON text"""
+    if isinstance(value, (dict, list)):
+        return current_app.json.dumps(value)
+    return value
+
+def _collect_excel_sections(data: Dict, prefix: str, summary, sections: List) -> None:
+    """Write scalar fields to the summary sheet and gather record lists as sheets"""
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, JSONArrayStream):
+            sections.append((name, map(value.serialize, value.rows)))
+        elif isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            sections.append((name, value))
+        elif isinstance(value, dict):
+            _collect_excel_sections(value, f"{name}.", summary, sections)
+        else:
+            summary.append((name, _excel_cell(value)))
+
+def _data_version() -> Tuple:
+    """
+    Newest updated_at and row count of each table the reports read, in one
+    round trip; inserts and updates advance a maximum, deletes change a count
+    """
+    return tuple(db.session.query(
+        db.session.query(func.max(Sponsor.updated_at)).scalar_subquery(),
+        db.session.query(func.count(Sponsor.id)).scalar_subquery(),
+        db.session.query(func.max(Event.updated_at)).scalar_subquery(),
+        db.session.query(func.count(Event.id)).scalar_subquery(),
+        db.session.query(func.max(Sponsorship.updated_at)).scalar_subquery(),
+        db.session.query(func.count(Sponsorship.id)).scalar_subquery()
+    ).one())
+
+def _report_cache_path(report_type: str, params: Dict, extension: str) -> Optional[str]:
+    """
+    Cache file for a report, named by a hash of its type, parameters and the
+    data version; None while a table changed within the last second, since
+    whole-second timestamps can't tell a further write that second apart
+    """
+    data_version = _data_version()
+    fresh_after = datetime.utcnow() - timedelta(seconds=REPORT_CACHE_SETTLE_SECONDS)
+    if any(isinstance(value, datetime) and value >= fresh_after for value in data_version):
+        return None
+    key = {'report_type': report_type, 'params': params, 'data_version': data_version}
+    digest = hashlib.sha256(current_app.json.dumps(key).encode()).hexdigest()
+    return os.path.join(REPORT_CACHE_DIR, f"{digest}.{extension}")
+
+def _evict_report_cache() -> None:
+    """Remove the oldest cached files beyond REPORT_CACHE_SIZE"""
+    entries = sorted(
+        (entry for entry in os.scandir(REPORT_CACHE_DIR) if not entry.name.endswith('.tmp')),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in entries[:-REPORT_CACHE_SIZE]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+def _write_excel_sheet(sheet, rows) -> None:
+    """Append records to a write-only sheet, taking the header from the first one"""
+    columns = None
+    for row in rows:
+        if columns is None:
+            columns = list(row)
+            sheet.append(columns)
+        sheet.append([_excel_cell(row.get(column)) for column in columns])
+
+def _write_excel_workbook(report_data: Dict, file_path: str) -> None:
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet('Summary')
+    summary.append(('Field', 'Value'))
+    
+    sections = []
+    _collect_excel_sections(report_data, '', summary, sections)
+    for name, rows in sections:
+        _write_excel_sheet(workbook.create_sheet(name[:31]), rows)
+    
+    workbook.save(file_path)
 
 class ReportGenerator:
     """Handles various report generation tasks."""
@@ -29,10 +273,11 @@ class ReportGenerator:
             Dictionary with report data
         """
         try:
+            # Only the reported columns, as plain rows rather than ORM instances
+            query = db.session.query(*_SPONSOR_REPORT_COLUMNS)
             if sponsor_id:
-                sponsors = Sponsor.query.filter(Sponsor.id == sponsor_id).all()
-            else:
-                sponsors = Sponsor.query.all()
+                query = query.filter(Sponsor.id == sponsor_id)
+            sponsors = query.all()
             
             report_data = {
                 'report_type': 'Sponsor Report',
@@ -42,6 +287,26 @@ class ReportGenerator:
                 'sponsors': []
             }
             
+            # Fetch the sponsorships of every listed sponsor in one query, as
+            # column rows since they are only read
+            sponsorships_by_sponsor = defaultdict(list)
+            if format_type in ['detailed', 'roi_analysis']:
+                query = db.session.query(
+                    Sponsorship.sponsor_id,
+                    Sponsorship.amount,
+                    Sponsorship.status,
+                    Sponsorship.roi,
+                    Sponsorship.created_at,
+                    Event.name.label('event_name'),
+                    Event.date.label('event_date')
+                ).outerjoin(
+                    Event, Event.id == Sponsorship.event_id
+                )
+                if sponsor_id:
+                    query = query.filter(Sponsorship.sponsor_id == sponsor_id)
+                for row in query.order_by(Sponsorship.id):
+                    sponsorships_by_sponsor[row.sponsor_id].append(row)
+            
             for sponsor in sponsors:
                 sponsor_data = {
                     'id': sponsor.id,
@@ -51,33 +316,27 @@ class ReportGenerator:
                     'email': sponsor.email,
                     'phone': sponsor.phone,
                     'total_invested': float(sponsor.total_invested) if sponsor.total_invested else 0,
-                    'created_at': sponsor.created_at.isoformat() if sponsor.created_at else None
+                    'created_at': sponsor.created_at
                 }
                 
                 if format_type in ['detailed', 'roi_analysis']:
-                    # Get sponsorship details
-                    sponsorships = db.session.query(Sponsorship).filter(
-                        Sponsorship.sponsor_id == sponsor.id
-                    ).all()
-                    
+                    sponsorships = sponsorships_by_sponsor.get(sponsor.id, [])
                     sponsor_data['sponsorship_count'] = len(sponsorships)
                     sponsor_data['sponsorships'] = []
                     
                     for sponsorship in sponsorships:
-                        event = Event.query.get(sponsorship.event_id)
                         sponsorship_data = {
                             'amount': float(sponsorship.amount),
                             'status': sponsorship.status,
                             'roi': float(sponsorship.roi) if sponsorship.roi else 0,
-                            'event_name': event.name if event else 'Unknown Event',
-                            'event_date': event.date.isoformat() if event else None,
-                            'created_at': sponsorship.created_at.isoformat() if sponsorship.created_at else None
+                            'event_name': sponsorship.event_name if sponsorship.event_name is not None else 'Unknown Event',
+                            'event_date': sponsorship.event_date,
+                            'created_at': sponsorship.created_at
                         }
                         sponsor_data['sponsorships'].append(sponsorship_data)
                 
                 if format_type == 'roi_analysis':
                     # Calculate ROI metrics
-                    from .finance import FinanceCalculator
                     roi_metrics = FinanceCalculator.calculate_sponsor_roi(sponsor.id)
                     sponsor_data['roi_metrics'] = roi_metrics
                 
@@ -101,10 +360,12 @@ class ReportGenerator:
             Dictionary with report data
         """
         try:
+            # Only the reported columns, as plain rows rather than ORM instances
+            query = db.session.query(*_EVENT_REPORT_COLUMNS)
             if event_id:
-                events = Event.query.filter(Event.id == event_id).all()
+                events = query.filter(Event.id == event_id).all()
             else:
-                events = Event.query.order_by(Event.date.desc()).all()
+                events = query.order_by(Event.date.desc()).all()
             
             report_data = {
                 'report_type': 'Event Report',
@@ -114,41 +375,54 @@ class ReportGenerator:
                 'events': []
             }
             
+            # Fetch the sponsorships of every listed event in one query, as
+            # column rows since they are only read
+            sponsorships_by_event = defaultdict(list)
+            if format_type in ['detailed', 'financial']:
+                query = db.session.query(
+                    Sponsorship.event_id,
+                    Sponsorship.amount,
+                    Sponsorship.status,
+                    Sponsorship.roi,
+                    Sponsorship.created_at,
+                    Sponsor.name.label('sponsor_name')
+                ).outerjoin(
+                    Sponsor, Sponsor.id == Sponsorship.sponsor_id
+                )
+                if event_id:
+                    query = query.filter(Sponsorship.event_id == event_id)
+                for row in query.order_by(Sponsorship.id):
+                    sponsorships_by_event[row.event_id].append(row)
+            
             for event in events:
                 event_data = {
                     'id': event.id,
                     'name': event.name,
-                    'date': event.date.isoformat(),
+                    'date': event.date,
                     'budget': float(event.budget),
                     'revenue': float(event.revenue),
                     'footfall': event.footfall,
-                    'created_at': event.created_at.isoformat() if event.created_at else None
+                    'created_at': event.created_at
                 }
                 
                 if format_type in ['detailed', 'financial']:
-                    # Get sponsorship details
-                    sponsorships = db.session.query(Sponsorship).filter(
-                        Sponsorship.event_id == event.id
-                    ).all()
-                    
+                    sponsorships = sponsorships_by_event.get(event.id, [])
                     event_data['sponsorship_count'] = len(sponsorships)
                     event_data['total_sponsorship'] = sum(s.amount for s in sponsorships)
                     event_data['sponsorships'] = []
                     
                     for sponsorship in sponsorships:
-                        sponsor = Sponsor.query.get(sponsorship.sponsor_id)
                         sponsorship_data = {
-                            'sponsor_name': sponsor.name if sponsor else 'Unknown Sponsor',
+                            'sponsor_name': sponsorship.sponsor_name if sponsorship.sponsor_name is not None else 'Unknown Sponsor',
                             'amount': float(sponsorship.amount),
                             'status': sponsorship.status,
                             'roi': float(sponsorship.roi) if sponsorship.roi else 0,
-                            'created_at': sponsorship.created_at.isoformat() if sponsorship.created_at else None
+                            'created_at': sponsorship.created_at
                         }
                         event_data['sponsorships'].append(sponsorship_data)
                 
                 if format_type == 'financial':
                     # Calculate financial metrics
-                    from .finance import FinanceCalculator
                     financial_summary = FinanceCalculator.get_event_financial_summary(event.id)
                     event_data['financial_summary'] = financial_summary
                 
@@ -171,38 +445,41 @@ class ReportGenerator:
             Dictionary with financial summary data
         """
         try:
-            from .finance import FinanceCalculator
-            
-            # Get various financial metrics
+            # Get various financial metrics; projections reuse the trends
+            # when they already cover the projection history
             trends = FinanceCalculator.analyze_financial_trends(months)
             top_sponsors = FinanceCalculator.get_top_performing_sponsors(10)
-            projections = FinanceCalculator.generate_financial_projections(6)
+            history = trends['monthly_trends'] if months >= PROJECTION_HISTORY_MONTHS and 'error' not in trends else None
+            projections = FinanceCalculator.generate_financial_projections(6, history)
             
-            # Calculate overall metrics
+            # Calculate overall metrics over the same calendar months as the
+            # trends; the period ends at generation time
             end_date = datetime.now()
-            start_date = end_date - timedelta(days=months * 30)
+            start_date = month_window_start(end_date, months)
             
-            events = Event.query.filter(
+            total_events, total_budget, total_revenue, total_footfall = db.session.query(
+                func.count(Event.id),
+                func.coalesce(func.sum(Event.budget), 0),
+                func.coalesce(func.sum(Event.revenue), 0),
+                func.coalesce(func.sum(Event.footfall), 0)
+            ).filter(
                 Event.date >= start_date,
                 Event.date <= end_date
-            ).all()
-            
-            total_budget = sum(event.budget for event in events)
-            total_revenue = sum(event.revenue for event in events)
-            total_events = len(events)
-            total_footfall = sum(event.footfall for event in events)
+            ).one()
+            total_footfall = int(total_footfall)
             
-            sponsorships = db.session.query(Sponsorship).filter(
+            total_sponsorship = db.session.query(
+                func.coalesce(func.sum(Sponsorship.amount), 0)
+            ).filter(
                 Sponsorship.created_at >= start_date,
-                Sponsorship.created_at <= end_date
-            ).all()
-            
-            total_sponsorship = sum(s.amount for s in sponsorships if s.status == 'completed')
+                Sponsorship.created_at <= end_date,
+                Sponsorship.status == 'completed'
+            ).scalar()
             
             report_data = {
                 'report_type': 'Financial Summary Report',
                 'period_months': months,
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': end_date.isoformat(),
                 'period_start': start_date.isoformat(),
                 'period_end': end_date.isoformat(),
                 
@@ -239,75 +516,75 @@ class ReportGenerator:
             Dictionary with ROI analysis data
         """
         try:
-            from .finance import FinanceCalculator
-            
             # Get all sponsors with ROI data
-            sponsors = db.session.query(
-                Sponsor,
-                func.sum(Sponsorship.amount).label('total_investment'),
-                func.count(Sponsorship.id).label('sponsorship_count'),
-                func.avg(Sponsorship.roi).label('avg_roi'),
-                func.min(Sponsorship.roi).label('min_roi'),
-                func.max(Sponsorship.roi).label('max_roi')
-            ).join(
-                Sponsorship, Sponsor.id == Sponsorship.sponsor_id
-            ).filter(
-                Sponsorship.status == 'completed'
-            ).group_by(
-                Sponsor.id
-            ).all()
-            
-            roi_data = []
-            total_investment = 0
-            total_revenue = 0
-            
-            for sponsor, investment, count, avg_roi, min_roi, max_roi in sponsors:
-                # Calculate actual revenue based on ROI
-                revenue = investment * (1 + (avg_roi / 100)) if avg_roi else investment
-                
-                sponsor_roi = {
-                    'sponsor_id': sponsor.id,
-                    'sponsor_name': sponsor.name,
-                    'industry': sponsor.industry,
-                    'total_investment': float(investment),
-                    'total_revenue': float(revenue),
-                    'sponsorship_count': count,
-                    'average_roi': float(avg_roi) if avg_roi else 0,
-                    'minimum_roi': float(min_roi) if min_roi else 0,
-                    'maximum_roi': float(max_roi) if max_roi else 0,
-                    'net_profit': float(revenue - investment)
-                }
-                
-                roi_data.append(sponsor_roi)
-                total_investment += investment
-                total_revenue += revenue
-            
-            # Sort by total investment (descending)
-            roi_data.sort(key=lambda x: x['total_investment'], reverse=True)
+            sponsors = db.session.execute(_ROI_ANALYSIS_STMT).all()
+            
+            # Per-sponsor columns as arrays; a missing ROI counts as 0
+            investments = np.array([row.total_investment or 0 for row in sponsors], dtype=np.float64)
+            avg_rois = np.array([row.avg_roi or 0 for row in sponsors], dtype=np.float64)
+            min_rois = np.array([row.min_roi or 0 for row in sponsors], dtype=np.float64)
+            max_rois = np.array([row.max_roi or 0 for row in sponsors], dtype=np.float64)
+            
+            # Calculate actual revenue based on ROI
+            revenues = investments * (1 + avg_rois / 100)
+            total_investment = float(investments.sum())
+            total_revenue = float(revenues.sum())
+            
+            # Sort by total investment (descending, ties in query order)
+            order = np.argsort(-investments, kind='stable')
+            roi_data = [{
+                'sponsor_id': sponsors[i].id,
+                'sponsor_name': sponsors[i].name,
+                'industry': sponsors[i].industry,
+                'total_investment': investment,
+                'total_revenue': revenue,
+                'sponsorship_count': sponsors[i].sponsorship_count,
+                'average_roi': avg_roi,
+                'minimum_roi': min_roi,
+                'maximum_roi': max_roi,
+                'net_profit': net_profit
+            } for i, investment, revenue, avg_roi, min_roi, max_roi, net_profit in zip(
+                order.tolist(),
+                investments[order].tolist(),
+                revenues[order].tolist(),
+                avg_rois[order].tolist(),
+                min_rois[order].tolist(),
+                max_rois[order].tolist(),
+                (revenues - investments)[order].tolist()
+            )]
             
             # Calculate overall metrics
             overall_roi = ((total_revenue - total_investment) / total_investment * 100) if total_investment > 0 else 0
             
-            # Industry-wise analysis
-            industry_analysis = {}
-            for data in roi_data:
-                industry = data['industry'] or 'Unknown'
-                if industry not in industry_analysis:
-                    industry_analysis[industry] = {
-                        'sponsors': 0,
-                        'total_investment': 0,
-                        'total_revenue': 0,
-                        'avg_roi': 0
-                    }
-                
-                industry_analysis[industry]['sponsors'] += 1
-                industry_analysis[industry]['total_investment'] += data['total_investment']
-                industry_analysis[industry]['total_revenue'] += data['total_revenue']
+            # Industry-wise analysis: integer-code industries in first-seen order,
+            # then total each one with a weighted bincount
+            industry_codes = {}
+            codes = np.array([
+                industry_codes.setdefault(data['industry'] or 'Unknown', len(industry_codes))
+                for data in roi_data
+            ], dtype=np.intp)
+            sponsor_counts = np.bincount(codes, minlength=len(industry_codes))
+            industry_investment = np.bincount(codes, weights=investments[order], minlength=len(industry_codes))
+            industry_revenue = np.bincount(codes, weights=revenues[order], minlength=len(industry_codes))
+            # Industry ROI for all industries at once; 0 where nothing was invested
+            has_investment = industry_investment > 0
+            industry_roi = np.where(
+                has_investment,
+                (industry_revenue - industry_investment) / np.where(has_investment, industry_investment, 1) * 100,
+                0.0
+            )
             
-            # Calculate industry averages
-            for industry, data in industry_analysis.items():
-                if data['total_investment'] > 0:
-                    data['avg_roi'] = ((data['total_revenue'] - data['total_investment']) / data['total_investment']) * 100
+            industry_analysis = {}
+            for industry, sponsor_count, investment, revenue, avg_roi in zip(
+                industry_codes, sponsor_counts.tolist(), industry_investment.tolist(),
+                industry_revenue.tolist(), industry_roi.tolist()
+            ):
+                industry_analysis[industry] = {
+                    'sponsors': sponsor_count,
+                    'total_investment': investment,
+                    'total_revenue': revenue,
+                    'avg_roi': avg_roi
+                }
             
             report_data = {
                 'report_type': 'ROI Analysis Report',
@@ -344,30 +621,11 @@ class ReportGenerator:
             Dictionary with monthly report data
         """
         try:
-            # Get date range for specified month
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                end_date = datetime(year, month + 1, 1) - timedelta(days=1)
+            start_date, next_month = _month_range(year, month)
             
-            # Get events in month
-            events = Event.query.filter(
-                Event.date >= start_date,
-                Event.date <= end_date
-            ).order_by(Event.date).all()
-            
-            # Get sponsorships in month
-            sponsorships = db.session.query(Sponsorship).filter(
-                Sponsorship.created_at >= start_date,
-                Sponsorship.created_at <= end_date
-            ).all()
-            
-            # Get new sponsors in month
-            new_sponsors = Sponsor.query.filter(
-                Sponsor.created_at >= start_date,
-                Sponsor.created_at <= end_date
-            ).all()
+            events = db.session.execute(_monthly_events_query(start_date, next_month)).all()
+            sponsorships = db.session.execute(_monthly_sponsorships_query(start_date, next_month)).all()
+            new_sponsors = db.session.execute(_monthly_new_sponsors_query(start_date, next_month)).all()
             
             # Calculate metrics
             total_budget = sum(event.budget for event in events)
@@ -376,64 +634,15 @@ class ReportGenerator:
             completed_sponsorships = [s for s in sponsorships if s.status == 'completed']
             total_sponsorship_amount = sum(s.amount for s in completed_sponsorships)
             
-            report_data = {
-                'report_type': 'Monthly Report',
-                'year': year,
-                'month': month,
-                'month_name': datetime(year, month, 1).strftime('%B'),
-                'period_start': start_date.isoformat(),
-                'period_end': end_date.isoformat(),
-                'generated_at': datetime.now().isoformat(),
-                
-                'summary_metrics': {
-                    'total_events': len(events),
-                    'total_budget': float(total_budget),
-                    'total_revenue': float(total_revenue),
-                    'net_profit': float(total_revenue - total_budget),
-                    'total_footfall': total_footfall,
-                    'new_sponsors': len(new_sponsors),
-                    'completed_sponsorships': len(completed_sponsorships),
-                    'total_sponsorship_amount': float(total_sponsorship_amount),
-                    'roi_percentage': float(((total_revenue - total_budget) / total_budget) * 100) if total_budget > 0 else 0
-                },
-                
-                'detailed_data': {
-                    'events': [
-                        {
-                            'id': event.id,
-                            'name': event.name,
-                            'date': event.date.isoformat(),
-                            'budget': float(event.budget),
-                            'revenue': float(event.revenue),
-                            'footfall': event.footfall,
-                            'profit': float(event.revenue - event.budget)
-                        }
-                        for event in events
-                    ],
-                    'new_sponsors': [
-                        {
-                            'id': sponsor.id,
-                            'name': sponsor.name,
-                            'industry': sponsor.industry,
-                            'contact_person': sponsor.contact_person,
-                            'email': sponsor.email,
-                            'created_at': sponsor.created_at.isoformat() if sponsor.created_at else None
-                        }
-                        for sponsor in new_sponsors
-                    ],
-                    'sponsorships': [
-                        {
-                            'id': sponsorship.id,
-                            'sponsor_name': Sponsor.query.get(sponsorship.sponsor_id).name if Sponsor.query.get(sponsorship.sponsor_id) else 'Unknown',
-                            'event_name': Event.query.get(sponsorship.event_id).name if Event.query.get(sponsorship.event_id) else 'Unknown',
-                            'amount': float(sponsorship.amount),
-                            'status': sponsorship.status,
-                            'roi': float(sponsorship.roi) if sponsorship.roi else 0,
-                            'created_at': sponsorship.created_at.isoformat() if sponsorship.created_at else None
-                        }
-                        for sponsorship in sponsorships
-                    ]
-                }
+            report_data = _monthly_report_header(year, month, start_date, next_month)
+            report_data['summary_metrics'] = _monthly_summary_metrics(
+                len(events), total_budget, total_revenue, total_footfall,
+                len(new_sponsors), len(completed_sponsorships), total_sponsorship_amount
+            )
+            report_data['detailed_data'] = {
+                'events': [_monthly_event(event) for event in events],
+                'new_sponsors': [_monthly_new_sponsor(sponsor) for sponsor in new_sponsors],
+                'sponsorships': [_monthly_sponsorship(sponsorship) for sponsorship in sponsorships]
             }
             
             return report_data
@@ -441,12 +650,63 @@ class ReportGenerator:
         except Exception as e:
             return {'error': f'Failed to generate monthly report: {str(e)}'}
     
+    @staticmethod
+    def generate_monthly_report_stream(year: int, month: int):
+        """
+        Stream the monthly report as a JSON response.
+        The summary is aggregated in SQL up front; the detailed rows are then
+        encoded straight from their cursors instead of being collected first.
+        
+        Args:
+            year: Year for report
+            month: Month for report (1-12)
+            
+        Returns:
+            Streaming JSON response with the same document as generate_monthly_report
+        """
+        start_date, next_month = _month_range(year, month)
+        in_month = (Event.date >= start_date, Event.date < next_month)
+        created_in_month = (Sponsorship.created_at >= start_date, Sponsorship.created_at < next_month)
+        
+        total_events, total_budget, total_revenue, total_footfall = db.session.query(
+            func.count(Event.id),
+            func.coalesce(func.sum(Event.budget), 0),
+            func.coalesce(func.sum(Event.revenue), 0),
+            func.coalesce(func.sum(Event.footfall), 0)
+        ).filter(*in_month).one()
+        completed_count, total_sponsorship_amount = db.session.query(
+            func.count(Sponsorship.id),
+            func.coalesce(func.sum(Sponsorship.amount), 0)
+        ).filter(*created_in_month, Sponsorship.status == 'completed').one()
+        new_sponsor_count = db.session.query(func.count(Sponsor.id)).filter(
+            Sponsor.created_at >= start_date,
+            Sponsor.created_at < next_month
+        ).scalar()
+        
+        report_data = _monthly_report_header(year, month, start_date, next_month)
+        report_data['summary_metrics'] = _monthly_summary_metrics(
+            total_events, total_budget, total_revenue, int(total_footfall),
+            new_sponsor_count, completed_count, total_sponsorship_amount
+        )
+        report_data['detailed_data'] = {
+            'events': JSONArrayStream(
+                _stream_rows(_monthly_events_query(start_date, next_month)), _monthly_event),
+            'new_sponsors': JSONArrayStream(
+                _stream_rows(_monthly_new_sponsors_query(start_date, next_month)), _monthly_new_sponsor),
+            'sponsorships': JSONArrayStream(
+                _stream_rows(_monthly_sponsorships_query(start_date, next_month)), _monthly_sponsorship)
+        }
+        
+        return stream_json_object(report_data)
+    
     @staticmethod
     def export_to_excel(report_data: Dict, filename: Optional[str] = None) -> str:
         """
-        Export report data to Excel format.
-        Note: This is a placeholder implementation.
-        In production, you would use libraries like pandas and openpyxl.
+        Export report data to an Excel workbook.
+        Scalar fields go on a Summary sheet and every list of records gets its
+        own sheet. The workbook is write-only, so rows are flushed to disk as
+        they are appended; JSONArrayStream sections are read straight from
+        their cursor.
         
         Args:
             report_data: Dictionary containing report data
@@ -456,12 +716,6 @@ class ReportGenerator:
             Path to generated Excel file
         """
         try:
-            # This is a placeholder for Excel export functionality
-            # In a real implementation, you would:
-            # 1. Convert report data to a pandas DataFrame
-            # 2. Use openpyxl to create an Excel file with multiple sheets
-            # 3. Save file and return path
-            
             if not filename:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f"finance_report_{timestamp}.xlsx"
@@ -470,19 +724,60 @@ class ReportGenerator:
             temp_dir = tempfile.gettempdir()
             file_path = os.path.join(temp_dir, filename)
             
-            # Placeholder: Create a simple text file for demonstration
-            with open(file_path, 'w') as f:
-                f.write("Finance Committee Report\n")
-                f.write("=" * 40 + "\n")
-                f.write(f"Generated: {datetime.now().isoformat()}\n\n")
-                f.write("This is a placeholder for Excel export.\n")
-                f.write("In production, this would be a proper Excel file.\n")
-            
+            _write_excel_workbook(report_data, file_path)
             return file_path
             
         except Exception as e:
             return f"Error exporting to Excel: {str(e)}"
     
+    @staticmethod
+    def export_report_to_excel(report_type: str, **params) -> str:
+        """
+        Generate a report and export it to Excel, reusing the workbook of an
+        earlier export while the report type, parameters and underlying data are
+        unchanged (e.g. repeat downloads of a closed month).
+        The cache is checked before the report is generated, so a hit runs only
+        the data version query.
+        
+        Args:
+            report_type: One of CACHEABLE_REPORTS
+            **params: Arguments for that report's generate_* method
+            
+        Returns:
+            Path to the Excel file, normally in the report cache; serve it as-is
+        """
+        builder = CACHEABLE_REPORTS.get(report_type)
+        if builder is None:
+            return f"Error exporting to Excel: Unknown report type '{report_type}'"
+        
+        try:
+            cached_path = _report_cache_path(report_type, params, 'xlsx')
+            if cached_path and os.path.exists(cached_path):
+                return cached_path
+            
+            report_data = getattr(ReportGenerator, builder)(**params)
+            if 'error' in report_data:
+                return f"Error exporting to Excel: {report_data['error']}"
+            if not cached_path:
+                return ReportGenerator.export_to_excel(report_data)
+            
+            # Write next to the cache entry, then rename it into place
+            os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=REPORT_CACHE_DIR)
+            os.close(fd)
+            try:
+                _write_excel_workbook(report_data, temp_path)
+                os.replace(temp_path, cached_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            
+            _evict_report_cache()
+            return cached_path
+            
+        except Exception as e:
+            return f"Error exporting to Excel: {str(e)}"
+    
     @staticmethod
     def generate_pdf_report(report_data: Dict, filename: Optional[str] = None) -> str:
         """
@@ -504,8 +799,9 @@ class ReportGenerator:
             # 2. Include charts, tables, and formatting
             # 3. Save file and return path
             
+            generated_at = datetime.now()
             if not filename:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                timestamp = generated_at.strftime('%Y%m%d_%H%M%S')
                 filename = f"finance_report_{timestamp}.pdf"
             
             # Create a temporary file path
@@ -516,7 +812,7 @@ class ReportGenerator:
             with open(file_path, 'w') as f:
                 f.write("Finance Committee Report (PDF Placeholder)\n")
                 f.write("=" * 50 + "\n")
-                f.write(f"Generated: {datetime.now().isoformat()}\n")
+                f.write(f"Generated: {generated_at.isoformat()}\n")
                 f.write(f"Report Type: {report_data.get('report_type', 'Unknown')}\n\n")
                 f.write("This is a placeholder for PDF generation.\n")
                 f.write("In production, this would be a properly formatted PDF.\n")
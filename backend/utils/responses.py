@@ -0,0 +1,87 @@
+"""
+Response Helpers for Finance Committee Platform
+"""
+
+from decimal import Decimal
+from typing import Callable, Iterable, NamedTuple
+import orjson
+from flask import current_app, stream_with_context
+from flask.json.provider import JSONProvider
+
+# Rows fetched from the cursor per round trip when streaming list endpoints
+STREAM_CHUNK_SIZE = 1000
+
+def _orjson_default(obj):
+    """Encode types orjson has no native support for"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson's C encoder/decoder
+    Keys are sorted like Flask's default provider; dates encode as ISO 8601
+    and NumPy scalars/arrays natively
+    """
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype="application/json")
+
+class JSONArrayStream(NamedTuple):
+    """Placeholder for an array in stream_json_object, encoded row by row"""
+    rows: Iterable
+    serialize: Callable
+
+def _encode_array(rows, serialize):
+    yield '['
+    for index, row in enumerate(rows):
+        if index:
+            yield ','
+        yield current_app.json.dumps(serialize(row))
+    yield ']'
+
+def _encode_value(value):
+    if isinstance(value, JSONArrayStream):
+        yield from _encode_array(value.rows, value.serialize)
+    elif isinstance(value, dict):
+        # Keys sorted to match the provider's OPT_SORT_KEYS output
+        yield '{'
+        for index, key in enumerate(sorted(value)):
+            if index:
+                yield ','
+            yield current_app.json.dumps(key) + ':'
+            yield from _encode_value(value[key])
+        yield '}'
+    else:
+        yield current_app.json.dumps(value)
+
+def stream_json_array(rows, serialize):
+    """
+    Stream an iterable of rows as a JSON array without building the full list
+    Usage: return stream_json_array(result, lambda row: {...})
+    """
+    def generate():
+        yield from _encode_array(rows, serialize)
+        yield '\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+def stream_json_object(document):
+    """
+    Stream a JSON document whose large arrays are given as JSONArrayStream values
+    Usage: return stream_json_object({'total': n, 'rows': JSONArrayStream(result, serialize)})
+    """
+    def generate():
+        yield from _encode_value(document)
+        yield '\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
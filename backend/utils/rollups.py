@@ -0,0 +1,100 @@
+"""
+Summary Table Maintenance for Finance Committee Platform
+"""
+
+from collections import defaultdict
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app import db
+from models import Event, EventMonthlyStats, SponsorRollup, Sponsorship
+
+def event_stats(event):
+    """Snapshot the rollup-relevant fields of an Event"""
+    return {
+        "date": event.date,
+        "budget": event.budget,
+        "revenue": event.revenue,
+        "footfall": event.footfall
+    }
+
+def update_event_monthly_stats(added=(), removed=()):
+    """
+    Apply event deltas to the monthly rollup within the current transaction
+    Usage: update_event_monthly_stats(added=[event_stats(event)], removed=[previous])
+    """
+    deltas = defaultdict(lambda: {"budget_sum": 0, "revenue_sum": 0, "footfall_sum": 0, "event_count": 0})
+    for sign, events in ((1, added), (-1, removed)):
+        for event in events:
+            if not event["date"]:
+                continue
+            event_date = event["date"]
+            delta = deltas[f"{event_date.year:04d}-{event_date.month:02d}"]
+            delta["budget_sum"] += sign * (event["budget"] or 0)
+            delta["revenue_sum"] += sign * (event["revenue"] or 0)
+            delta["footfall_sum"] += sign * (event["footfall"] or 0)
+            delta["event_count"] += sign
+
+    if not deltas:
+        return
+
+    stmt = mysql_insert(EventMonthlyStats).values(
+        [dict(month=month, **delta) for month, delta in deltas.items()]
+    )
+    db.session.execute(stmt.on_duplicate_key_update(
+        budget_sum=EventMonthlyStats.budget_sum + stmt.inserted.budget_sum,
+        revenue_sum=EventMonthlyStats.revenue_sum + stmt.inserted.revenue_sum,
+        footfall_sum=EventMonthlyStats.footfall_sum + stmt.inserted.footfall_sum,
+        event_count=EventMonthlyStats.event_count + stmt.inserted.event_count
+    ))
+
+def rebuild_event_monthly_stats():
+    """Recompute the monthly rollup from the events table"""
+    month = func.date_format(Event.date, '%Y-%m')
+    db.session.execute(delete(EventMonthlyStats))
+    db.session.execute(insert(EventMonthlyStats).from_select(
+        ["month", "budget_sum", "revenue_sum", "footfall_sum", "event_count"],
+        select(
+            month,
+            func.coalesce(func.sum(Event.budget), 0),
+            func.coalesce(func.sum(Event.revenue), 0),
+            func.coalesce(func.sum(Event.footfall), 0),
+            func.count(Event.id)
+        ).where(Event.date.isnot(None)).group_by(month)
+    ))
+
+_SPONSOR_ROLLUP_COLUMNS = ["sponsor_id", "total_investment", "sponsorship_count", "roi_sum", "roi_count"]
+
+def _sponsor_totals():
+    """Completed sponsorship totals per sponsor, in SponsorRollup column order"""
+    return select(
+        Sponsorship.sponsor_id,
+        func.coalesce(func.sum(Sponsorship.amount), 0),
+        func.count(Sponsorship.id),
+        func.coalesce(func.sum(Sponsorship.roi), 0),
+        func.count(Sponsorship.roi)
+    ).where(
+        Sponsorship.sponsor_id.isnot(None),
+        Sponsorship.status == 'completed'
+    ).group_by(Sponsorship.sponsor_id)
+
+def refresh_sponsor_rollups(sponsor_ids):
+    """
+    Recompute the rollup rows of the given sponsors within the current transaction
+    Usage: refresh_sponsor_rollups({sponsorship.sponsor_id})
+    """
+    sponsor_ids = {sponsor_id for sponsor_id in sponsor_ids if sponsor_id is not None}
+    if not sponsor_ids:
+        return
+
+    # Make pending sponsorship changes (and any delete cascades) visible first
+    db.session.flush()
+    db.session.execute(delete(SponsorRollup).where(SponsorRollup.sponsor_id.in_(sponsor_ids)))
+    db.session.execute(insert(SponsorRollup).from_select(
+        _SPONSOR_ROLLUP_COLUMNS,
+        _sponsor_totals().where(Sponsorship.sponsor_id.in_(sponsor_ids))
+    ))
+
+def rebuild_sponsor_rollups():
+    """Recompute the sponsor rollup from the sponsorships table"""
+    db.session.execute(delete(SponsorRollup))
+    db.session.execute(insert(SponsorRollup).from_select(_SPONSOR_ROLLUP_COLUMNS, _sponsor_totals()))
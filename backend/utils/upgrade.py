@@ -0,0 +1,69 @@
+"""
+Database Upgrade Steps for Finance Committee Platform
+Brings a database created from an older database/schema.sql up to date.
+Every step checks before it changes anything, so `flask upgrade-db` can be
+rerun safely; rollup tables are rebuilt from their source rows each time.
+"""
+
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.schema import CreateColumn
+from app import db
+from models import EventMonthlyStats, SponsorRollup, Sponsorship
+from utils.rollups import rebuild_event_monthly_stats, rebuild_sponsor_rollups
+
+def _add_missing_column(column):
+    """ALTER TABLE ... ADD COLUMN from the model's definition, unless it already exists"""
+    table = column.table.name
+    if column.name in {existing["name"] for existing in inspect(db.engine).get_columns(table)}:
+        return
+    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+    db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {ddl}"))
+
+def _sponsorship_revenue_generated():
+    """Add the stored amount * (1 + roi/100) column; MySQL fills it for existing rows"""
+    _add_missing_column(Sponsorship.__table__.c.revenue_generated)
+
+def _event_monthly_stats():
+    """Create the monthly event rollup if missing, then backfill it"""
+    EventMonthlyStats.__table__.create(db.engine, checkfirst=True)
+    rebuild_event_monthly_stats()
+
+def _sponsor_rollups():
+    """Create the per-sponsor rollup if missing, then backfill it"""
+    SponsorRollup.__table__.create(db.engine, checkfirst=True)
+    rebuild_sponsor_rollups()
+
+# Sponsorship indexes superseded by the composites in the model, under both
+# their schema.sql and their model names
+_SUPERSEDED_SPONSORSHIP_INDEXES = {
+    "idx_sponsorships_status", "idx_sponsorships_sponsor",
+    "idx_sponsorships_sponsor_amount", "idx_sponsorships_sponsor_created",
+    "ix_sponsorship_sponsor_amount", "ix_sp_sponsor_created",
+}
+
+def _sponsorship_indexes():
+    """Add the (sponsor_id, created_at, amount) index if missing, then drop the indexes it supersedes"""
+    table = Table(Sponsorship.__tablename__, MetaData(), autoload_with=db.engine)
+    columns = {tuple(column.name for column in index.columns): index for index in table.indexes}
+    replacement = next(index for index in Sponsorship.__table__.indexes if index.name == "ix_sp_sponsor_created_amount")
+    if ("sponsor_id", "created_at", "amount") not in columns:
+        replacement.create(db.engine)
+    # Created first, so the sponsor_id foreign key is never left without an index
+    for index in table.indexes:
+        if index.name in _SUPERSEDED_SPONSORSHIP_INDEXES:
+            index.drop(db.engine)
+
+# (description, step) pairs, applied in order; each is committed on its own
+UPGRADE_STEPS = (
+    ("sponsorships.revenue_generated column", _sponsorship_revenue_generated),
+    ("event_monthly_stats rollup", _event_monthly_stats),
+    ("sponsor_rollups rollup", _sponsor_rollups),
+    ("sponsorships indexes", _sponsorship_indexes),
+)
+
+def upgrade_database(echo=print):
+    """Apply every upgrade step, reporting each as it completes"""
+    for description, step in UPGRADE_STEPS:
+        step()
+        db.session.commit()
+        echo(f"{description}: up to date")
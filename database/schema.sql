@@ -11,6 +11,8 @@ CREATE TABLE fc_members (
     email VARCHAR(120) UNIQUE NOT NULL,
     password_hash VARCHAR(200) NOT NULL,
     role VARCHAR(50) DEFAULT 'finance',
+    last_login TIMESTAMP NULL,
+    is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -48,22 +50,62 @@ CREATE TABLE sponsorships (
     amount DECIMAL(12,2) NOT NULL,
     status ENUM('pending', 'confirmed', 'completed', 'cancelled') DEFAULT 'pending',
     roi DECIMAL(5,2) DEFAULT 0.00,
+    revenue_generated DECIMAL(18,6) AS (amount * (100 + COALESCE(roi, 0)) / 100.0) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (sponsor_id) REFERENCES sponsors(id) ON DELETE CASCADE,
     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
 );
 
+-- Per-month event totals, kept current by the event write routes
+CREATE TABLE event_monthly_stats (
+    month CHAR(7) PRIMARY KEY,
+    budget_sum DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    revenue_sum DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    footfall_sum BIGINT NOT NULL DEFAULT 0,
+    event_count INT NOT NULL DEFAULT 0
+);
+
+-- Per-sponsor completed sponsorship totals, kept current by the sponsorship,
+-- sponsor and event write routes
+CREATE TABLE sponsor_rollups (
+    sponsor_id INT PRIMARY KEY,
+    total_investment DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    sponsorship_count INT NOT NULL DEFAULT 0,
+    roi_sum DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    roi_count INT NOT NULL DEFAULT 0
+);
+
 -- Indexes for performance optimization
 CREATE INDEX idx_sponsors_industry ON sponsors(industry);
 CREATE INDEX idx_sponsors_total_invested ON sponsors(total_invested);
 CREATE INDEX idx_events_date ON events(date);
+CREATE INDEX idx_events_date_revenue ON events(date, revenue);
+CREATE INDEX idx_events_revenue_desc ON events(revenue DESC);
 CREATE INDEX idx_events_budget ON events(budget);
-CREATE INDEX idx_sponsorships_status ON sponsorships(status);
-CREATE INDEX idx_sponsorships_sponsor ON sponsorships(sponsor_id);
+-- Sponsorship indexes, one per query shape; sponsor_id and status have no
+-- index of their own since the composites leading with them cover both
+-- Per-event listings, totals and reports
 CREATE INDEX idx_sponsorships_event ON sponsorships(event_id);
+-- Monthly report: sponsorships created in the month, any status
+CREATE INDEX idx_sponsorships_created_at ON sponsorships(created_at);
+-- Status-filtered listings newest first, and the per-status summary
+CREATE INDEX idx_sponsorships_status_created ON sponsorships(status, created_at DESC);
+-- Per-sponsor listings by created_at, and the per-sponsor count/SUM(amount)
+CREATE INDEX idx_sponsorships_sponsor_created_amount ON sponsorships(sponsor_id, created_at, amount);
+-- Completed-only per-event and per-sponsor totals (finance utilities, ROI report)
+CREATE INDEX idx_sponsorships_status_event ON sponsorships(status, event_id, amount);
+CREATE INDEX idx_sponsorships_status_sponsor ON sponsorships(status, sponsor_id, amount, revenue_generated, roi);
+CREATE INDEX idx_sponsor_rollups_total ON sponsor_rollups(total_investment);
+CREATE INDEX idx_sponsors_updated_at ON sponsors(updated_at);
+CREATE INDEX idx_events_updated_at ON events(updated_at);
+CREATE INDEX idx_sponsorships_updated_at ON sponsorships(updated_at);
+CREATE INDEX idx_fc_members_is_active ON fc_members(is_active);
+CREATE INDEX idx_fc_members_role_active ON fc_members(role, is_active);
+CREATE UNIQUE INDEX idx_fc_members_email_lower ON fc_members((LOWER(email)));
 
--- Unique constraint for sponsor-event combinations
+-- Unique constraint for sponsor-event combinations; also the index for the
+-- sponsor_id foreign key and sponsor/event joins
 CREATE UNIQUE INDEX idx_unique_sponsorship ON sponsorships(sponsor_id, event_id);
 
 -- Sample Data (Optional - remove for production)
@@ -77,4 +119,19 @@ INSERT INTO sponsors (name, industry, contact_person, email, phone) VALUES
 
 INSERT INTO events (name, date, budget, footfall, revenue) VALUES 
 ('Annual Tech Summit', '2024-03-15', 500000.00, 500, 750000.00),
-('Finance Workshop', '2024-04-10', 250000.00, 100, 300000.00);
\ No newline at end of file
+('Finance Workshop', '2024-04-10', 250000.00, 100, 300000.00);
+
+-- Build the monthly rollup from the events above; databases created from an
+-- older schema get the table and its backfill from `flask upgrade-db`
+INSERT INTO event_monthly_stats (month, budget_sum, revenue_sum, footfall_sum, event_count)
+SELECT DATE_FORMAT(date, '%Y-%m'), COALESCE(SUM(budget), 0), COALESCE(SUM(revenue), 0), COALESCE(SUM(footfall), 0), COUNT(*)
+FROM events
+GROUP BY DATE_FORMAT(date, '%Y-%m');
+
+-- Build the sponsor rollup from the sponsorships table; databases created
+-- from an older schema get the table and its backfill from `flask upgrade-db`
+INSERT INTO sponsor_rollups (sponsor_id, total_investment, sponsorship_count, roi_sum, roi_count)
+SELECT sponsor_id, COALESCE(SUM(amount), 0), COUNT(*), COALESCE(SUM(roi), 0), COUNT(roi)
+FROM sponsorships
+WHERE status = 'completed'
+GROUP BY sponsor_id;